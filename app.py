@@ -1,58 +1,55 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import desc
+import click
+from sqlalchemy import desc, event
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import aliased, joinedload
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import sys
+import subprocess
 import requests
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import random
-import spacy
-import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import pandas as pd
-import google.generativeai as genai
+from scipy import sparse
 from dotenv import load_dotenv
 import io
 from io import BytesIO
-from xhtml2pdf import pisa
-from flask import send_file
 import re
-from PIL import Image
+import threading
+import time
+import heapq
+import itertools
+import hashlib
+import shutil
+import zipfile
+import multiprocessing
+from contextlib import contextmanager
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single writer is assumed
+    fcntl = None
+
+# sklearn, google.generativeai, xhtml2pdf and PIL are imported inside the code
+# that needs them, so a worker boot or a CLI command doesn't pay for them.
+# Check the cost with `flask import-report`.
 
 
 load_dotenv()
 
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
-
-GEMINI_MODEL = None
-MODEL_NAMES = [
-    'gemini-2.0-flash-exp',     
-    'gemini-2.0-flash',           
-    'gemini-1.5-flash-latest',   
-    'models/gemini-2.0-flash-exp',
-    'models/gemini-1.5-flash',
-]
-
-for model_name in MODEL_NAMES:
-    try:
-        GEMINI_MODEL = genai.GenerativeModel(model_name)
-        print(f"✅ Successfully loaded: {model_name}")
-        break
-    except Exception as e:
-        print(f"❌ Failed to load {model_name}: {e}")
-        continue
-
-if not GEMINI_MODEL:
-    print("⚠ Warning: No Gemini model could be loaded!")
-
-
 app = Flask(__name__)
 WHEREBY_API_KEY = os.getenv("WHEREBY_API_KEY")
+# Point at fake_ai_server.py (e.g. http://127.0.0.1:8765/v1) for offline load tests.
+WHEREBY_API_URL = os.getenv("WHEREBY_API_URL", "https://api.whereby.dev/v1").rstrip('/')
+WHEREBY_TIMEOUT = float(os.getenv("WHEREBY_TIMEOUT", "10"))
                                                                      
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -62,9 +59,15 @@ db_user = os.getenv("DB_USERNAME", "root")
 db_password = os.getenv("DB_PASSWORD", "")
 db_host = os.getenv("DB_HOST", "localhost")
 db_name = os.getenv("DB_NAME", "bput15")
-app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}'
+# DATABASE_URL (e.g. a local SQLite file for benchmarks) overrides the MySQL settings.
+# It is the only way to point the app at another database: the engine is bound
+# below at import time, so set it in the environment before importing app.
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL") or f'mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.secret_key = os.getenv("SECRET_KEY", "your_super_secret_key_bput")
+app.config['STUDENT_VECTOR_CACHE_SIZE'] = int(os.getenv("STUDENT_VECTOR_CACHE_SIZE", "2048"))
+app.config['PERSIST_STUDENT_VECTORS'] = os.getenv("PERSIST_STUDENT_VECTORS", "false").lower() == "true"
+app.config['BACKGROUND_WORKERS'] = int(os.getenv("BACKGROUND_WORKERS", "2"))
 
 db = SQLAlchemy(app)
 
@@ -121,6 +124,7 @@ class Student(db.Model):
     linkedin_url = db.Column(db.String(500), nullable=True)
     portfolio_url = db.Column(db.String(500), nullable=True)
     address = db.Column(db.String(255), nullable=True)
+    skill_links = db.relationship('StudentSkill', lazy=True, cascade='all, delete-orphan')
 
 
 class StudentProject(db.Model):
@@ -148,6 +152,7 @@ class JobPosting(db.Model):
     contact_mobile = db.Column(db.String(10))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     applications = db.relationship('JobApplication', backref='job_posting', lazy=True, cascade='all, delete-orphan')
+    skill_links = db.relationship('JobSkill', lazy=True, cascade='all, delete-orphan')
 
 
 class JobApplication(db.Model):
@@ -166,6 +171,12 @@ class Certificate(db.Model):
     title = db.Column(db.String(200), nullable=False)
     filename = db.Column(db.String(200), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Skill extraction runs after the upload: pending -> processing -> done / failed
+    analysis_status = db.Column(db.String(20), default='done', nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the uploaded file
+    skills_found = db.Column(db.Text)  # JSON list of skills this certificate added
+    analysis_error = db.Column(db.String(300))
+    analyzed_at = db.Column(db.DateTime)  # when analysis finished, or last started while pending/processing
 
 
 class Message(db.Model):
@@ -222,6 +233,89 @@ class StudentProgress(db.Model):
 # --- END NEW MODEL CLASS ---
 
 
+class Skill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+
+# Skill -> student / skill -> job inverted indexes. The JSON skills columns stay
+# the display copy; these tables are kept in sync on every write.
+class StudentSkill(db.Model):
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), primary_key=True, index=True)
+
+
+class JobSkill(db.Model):
+    job_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), primary_key=True, index=True)
+
+
+class FitScore(db.Model):
+    """Precomputed student x job fit score, read by reverse candidate matching."""
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    generation = db.Column(db.String(40))  # job index vocabulary the score was computed with
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_fit_score_job_score', 'job_id', 'score'),)
+
+
+class Recommendation(db.Model):
+    """Top job recommendations for a student, precomputed by batch_recommendations.py."""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), nullable=False)
+    rank = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    roadmap = db.Column(db.Text)
+    profile_hash = db.Column(db.String(40), nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    job = db.relationship('JobPosting')
+
+    __table_args__ = (db.Index('ix_recommendation_student_rank', 'student_id', 'rank'),)
+
+
+class RecommendationRun(db.Model):
+    """When a student's recommendations were last stored, so an empty result is cached too."""
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    profile_hash = db.Column(db.String(40), nullable=False)
+    latest_job_id = db.Column(db.Integer, nullable=False, default=0)  # newest posting that was considered
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StudentVector(db.Model):
+    """Persisted TF-IDF profile vector, valid for one job index vocabulary generation and profile version."""
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    generation = db.Column(db.String(40), nullable=False)
+    profile_version = db.Column(db.String(40))
+    indices = db.Column(db.Text, nullable=False)
+    weights = db.Column(db.Text, nullable=False)
+    project_count = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ImprovementPlan(db.Model):
+    """Generated improvement plan, shared by every request with the same role, company, job skills and skill gap."""
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(40), unique=True, nullable=False)
+    job_role = db.Column(db.String(200))
+    company = db.Column(db.String(200))
+    missing_skills = db.Column(db.Text)  # JSON list, normalised and sorted
+    plan = db.Column(db.Text, nullable=False)
+    hits = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class CertificateSkillCache(db.Model):
+    """Skills extracted from one certificate image, keyed by the sha256 of the file."""
+    content_hash = db.Column(db.String(64), primary_key=True)
+    skills = db.Column(db.Text, nullable=False)  # JSON list
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -257,6 +351,8 @@ INDIAN_IT_CITIES = [
     "Noida", "Mumbai", "Kolkata", "Ahmedabad", "Bhubaneswar", "Kochi"
 ]
 
+LOCATION_RESULTS_LIMIT = 50  # jobs per page when browsing a city
+
 
 @app.template_filter('fromjson')
 def fromjson_filter(value):
@@ -267,197 +363,2658 @@ def fromjson_filter(value):
         return [] 
 
 
-def get_recommendations(student_id):
-    student = Student.query.get(student_id)
-    if not student:
-        return []
+# ==================== CACHING ====================
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
 
-    all_jobs = JobPosting.query.all()
-    applied_job_ids = {app.job_id for app in student.applications}
+
+# ==================== BACKGROUND TASKS ====================
+
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['BACKGROUND_WORKERS'],
+                                         thread_name_prefix='elevatr-bg')
+
+
+def run_on(executor, fn, *args, **kwargs):
+    """Runs fn on the given pool inside an application context; returns its future."""
+    def task():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                print(f"Background task {fn.__name__} failed: {e}")
+                db.session.rollback()
+    return executor.submit(task)
+
+
+def run_in_background(fn, *args, **kwargs):
+    """Runs fn on the background pool inside an application context."""
+    return run_on(BACKGROUND_EXECUTOR, fn, *args, **kwargs)
+
+
+# ==================== AI CLIENT ====================
+
+MODEL_NAMES = [
+    'gemini-2.0-flash-exp',     
+    'gemini-2.0-flash',           
+    'gemini-1.5-flash-latest',   
+    'models/gemini-2.0-flash-exp',
+    'models/gemini-1.5-flash',
+]
+# Set to e.g. http://127.0.0.1:8765 to send Gemini calls to fake_ai_server.py over REST.
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+GEMINI_PROBE_INTERVAL = int(os.getenv("GEMINI_PROBE_INTERVAL", "300"))
+GEMINI_FAILURE_COOLDOWN = int(os.getenv("GEMINI_FAILURE_COOLDOWN", "60"))
+
+
+class GeminiClientManager:
+    """Picks a working Gemini model at runtime instead of once at import.
+
+    Nothing happens until start(): the SDK is imported and every candidate is
+    probed (a cheap count_tokens call) on a daemon thread that repeats every
+    probe_interval seconds. generate_content() tries the active model first and
+    fails over down MODEL_NAMES when a call errors; a failing model sits out for
+    failure_cooldown seconds unless every other candidate is failing too. Once
+    its cooldown has passed, the next call gets it as a single trial (half-open)
+    without waiting for the prober; failing the trial restarts the cooldown.
+    """
+
+    LATENCY_WINDOW = 100
+
+    def __init__(self, model_names, probe_interval=GEMINI_PROBE_INTERVAL, failure_cooldown=GEMINI_FAILURE_COOLDOWN):
+        self.model_names = list(model_names)
+        self.probe_interval = probe_interval
+        self.failure_cooldown = failure_cooldown
+        self.lock = threading.Lock()
+        self.active = None
+        self.models = {}
+        self.stats = {name: {
+            'calls': 0, 'errors': 0, 'latencies_ms': [], 'last_error': None,
+            'healthy': None, 'cooldown_until': 0.0, 'last_probe': None, 'probe_ms': None,
+        } for name in self.model_names}
+        self._genai = None
+        self._prober = None
+
+    @property
+    def api_key(self):
+        return os.getenv("GOOGLE_API_KEY")
+
+    def available(self):
+        """True when a key is configured and some candidate is healthy, unprobed or due a trial call."""
+        if not self.api_key:
+            return False
+        now = time.time()
+        with self.lock:
+            return any(s['healthy'] is not False or s['cooldown_until'] <= now for s in self.stats.values())
+
+    def start(self):
+        """Starts the background prober once; returns immediately."""
+        if self._prober is not None or not self.api_key:
+            return
+        with self.lock:
+            if self._prober is None:
+                self._prober = threading.Thread(target=self._probe_loop, name='gemini-probe', daemon=True)
+                self._prober.start()
+
+    def _model(self, name):
+        with self.lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                if GEMINI_API_ENDPOINT:
+                    genai.configure(api_key=self.api_key, transport='rest',
+                                    client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+                else:
+                    genai.configure(api_key=self.api_key)
+                self._genai = genai
+            if name not in self.models:
+                self.models[name] = self._genai.GenerativeModel(name)
+            return self.models[name]
+
+    def _record(self, name, elapsed_ms, error=None, probe=False):
+        with self.lock:
+            stats = self.stats[name]
+            if probe:
+                stats['last_probe'] = datetime.utcnow().isoformat()
+                stats['probe_ms'] = round(elapsed_ms, 1)
+            else:
+                stats['calls'] += 1
+                stats['latencies_ms'] = (stats['latencies_ms'] + [elapsed_ms])[-self.LATENCY_WINDOW:]
+            if error is None:
+                stats['healthy'] = True
+                stats['cooldown_until'] = 0.0
+                # Calls only fill an empty slot; probes also move back to a preferred model that recovered.
+                if self.active is None or (probe and self.model_names.index(name) < self.model_names.index(self.active)):
+                    self.active = name
+            else:
+                if not probe:
+                    stats['errors'] += 1
+                stats['healthy'] = False
+                stats['last_error'] = str(error)[:200]
+                stats['cooldown_until'] = time.time() + self.failure_cooldown
+                if self.active == name:
+                    self.active = None
+
+    def probe(self, name):
+        started = time.perf_counter()
+        try:
+            self._model(name).count_tokens("ping")
+        except Exception as e:
+            self._record(name, (time.perf_counter() - started) * 1000, error=e, probe=True)
+            print(f"❌ Gemini model {name} failed its health probe: {e}")
+            return False
+        self._record(name, (time.perf_counter() - started) * 1000, probe=True)
+        return True
+
+    def _probe_loop(self):
+        while True:
+            for name in self.model_names:
+                self.probe(name)
+            with self.lock:
+                active = self.active
+            if active:
+                print(f"✅ Gemini model in use: {active}")
+            else:
+                print("⚠ Warning: No Gemini model passed its health probe!")
+            if self.probe_interval <= 0:
+                return
+            time.sleep(self.probe_interval)
+
+    def candidates(self):
+        """Models to try, in order: the active one, then healthy or unprobed ones, then those cooling down.
+
+        A failed model whose cooldown has passed is handed out as a trial: its
+        cooldown is re-armed here, so concurrent callers do not all pile onto it
+        while the trial is in flight. A successful call clears it again.
+        """
+        now = time.time()
+        with self.lock:
+            ready = [n for n in self.model_names if self.stats[n]['cooldown_until'] <= now]
+            cooling = [n for n in self.model_names if self.stats[n]['cooldown_until'] > now]
+            for name in ready:
+                if self.stats[name]['healthy'] is False:
+                    self.stats[name]['cooldown_until'] = now + self.failure_cooldown
+            if self.active in ready:
+                ready.remove(self.active)
+                ready.insert(0, self.active)
+        return ready + cooling
+
+    def generate_content(self, contents, **kwargs):
+        """Calls the first candidate that succeeds; raises the last error if all fail.
+
+        A request_options timeout is treated as a budget for the whole failover,
+        not for each model. With stream=True the chunks are returned as a
+        generator; see _stream_content.
+        """
+        if not self.api_key:
+            raise RuntimeError("GOOGLE_API_KEY is not configured")
+        self.start()
+
+        request_options = dict(kwargs.pop('request_options', None) or {})
+        deadline = time.monotonic() + request_options['timeout'] if 'timeout' in request_options else None
+        if kwargs.get('stream'):
+            return self._stream_content(contents, deadline, request_options, kwargs)
+
+        last_error = None
+        for name in self.candidates():
+            self._set_timeout(request_options, deadline, last_error)
+            started = time.perf_counter()
+            try:
+                response = self._model(name).generate_content(contents, request_options=request_options, **kwargs)
+            except Exception as e:
+                self._record(name, (time.perf_counter() - started) * 1000, error=e)
+                print(f"Gemini call to {name} failed, trying the next model: {e}")
+                last_error = e
+                continue
+            self._record(name, (time.perf_counter() - started) * 1000)
+            return response
+        raise last_error
+
+    def _stream_content(self, contents, deadline, request_options, kwargs):
+        """Yields chunks from the first candidate that streams successfully.
+
+        The SDK only reports most errors while the stream is being read, so the
+        iteration is covered too: a model that fails before sending a chunk is
+        skipped like a failed call, while a failure after the first chunk is
+        raised to the caller. Latency is recorded when the stream ends.
+        """
+        last_error = None
+        for name in self.candidates():
+            self._set_timeout(request_options, deadline, last_error)
+            started = time.perf_counter()
+            sent = False
+            try:
+                for chunk in self._model(name).generate_content(contents, request_options=request_options, **kwargs):
+                    sent = True
+                    yield chunk
+            except GeneratorExit:
+                self._record(name, (time.perf_counter() - started) * 1000)  # the reader went away, not the model
+                raise
+            except Exception as e:
+                self._record(name, (time.perf_counter() - started) * 1000, error=e)
+                if sent:
+                    raise
+                print(f"Gemini stream from {name} failed, trying the next model: {e}")
+                last_error = e
+                continue
+            self._record(name, (time.perf_counter() - started) * 1000)
+            return
+        raise last_error
+
+    @staticmethod
+    def _set_timeout(request_options, deadline, last_error):
+        if deadline is not None:
+            request_options['timeout'] = deadline - time.monotonic()
+            if request_options['timeout'] <= 0:
+                raise last_error or TimeoutError("AI call deadline exceeded")
+
+    def status(self):
+        with self.lock:
+            models = {}
+            for name, stats in self.stats.items():
+                latencies = sorted(stats['latencies_ms'])
+                models[name] = {
+                    'healthy': stats['healthy'],
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(sum(latencies) / len(latencies), 1) if latencies else None,
+                    'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+                    'probe_ms': stats['probe_ms'],
+                    'last_probe': stats['last_probe'],
+                    'last_error': stats['last_error'],
+                }
+            return {'configured': bool(self.api_key), 'active': self.active, 'models': models}
+
+
+GEMINI = GeminiClientManager(MODEL_NAMES)
+
+
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+# Batch work never takes every slot, so chat always has one free.
+AI_BATCH_MAX_CONCURRENCY = int(os.getenv("AI_BATCH_MAX_CONCURRENCY", str(max(AI_MAX_CONCURRENCY - 1, 1))))
+AI_INTERACTIVE_TIMEOUT = float(os.getenv("AI_INTERACTIVE_TIMEOUT", "30"))
+AI_BATCH_TIMEOUT = float(os.getenv("AI_BATCH_TIMEOUT", "120"))
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+AI_BREAKER_THRESHOLD = int(os.getenv("AI_BREAKER_THRESHOLD", "5"))
+AI_BREAKER_RESET = float(os.getenv("AI_BREAKER_RESET", "30"))
+
+
+class AIGatewayError(Exception):
+    """A Gemini call was refused or gave up before reaching a model."""
+
+
+class AIBusyError(AIGatewayError):
+    """No call slot freed up before the deadline."""
+
+
+class AICircuitOpenError(AIGatewayError):
+    """Recent calls kept failing, so new ones fail fast for a while."""
+
+
+class AIGateway:
+    """The one path every Gemini call takes.
+
+    - A per-process priority semaphore caps calls in flight. Waiters are served
+      interactive-first, and batch work is held to its own lower cap.
+    - Each call has a deadline that covers queueing, retries and the request
+      itself; the remainder is passed down as the request timeout.
+    - Transient errors (429/5xx, timeouts, connection drops) are retried with
+      exponential backoff and full jitter while the deadline allows.
+    - After breaker_threshold consecutive failed calls the breaker opens and
+      calls fail fast for breaker_reset seconds, then a single trial call
+      decides whether it closes again.
+
+    client is anything with available() and generate_content(contents, **kwargs),
+    so tests can point the gateway at a stub or a local fake server.
+    """
+
+    INTERACTIVE = 0
+    BATCH = 1
+    RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+    def __init__(self, client, max_concurrency=AI_MAX_CONCURRENCY, batch_concurrency=AI_BATCH_MAX_CONCURRENCY,
+                 interactive_timeout=AI_INTERACTIVE_TIMEOUT, batch_timeout=AI_BATCH_TIMEOUT,
+                 max_retries=AI_MAX_RETRIES, breaker_threshold=AI_BREAKER_THRESHOLD, breaker_reset=AI_BREAKER_RESET):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.batch_concurrency = min(batch_concurrency, max_concurrency)
+        self.timeouts = {self.INTERACTIVE: interactive_timeout, self.BATCH: batch_timeout}
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+
+        self.cond = threading.Condition()
+        self.waiting = []
+        self.tickets = itertools.count()
+        self.in_flight = {self.INTERACTIVE: 0, self.BATCH: 0}
+
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.counters = {'calls': 0, 'failures': 0, 'retries': 0, 'busy': 0, 'short_circuited': 0}
+
+    # ----- concurrency -----
+
+    def _acquire(self, priority, deadline):
+        with self.cond:
+            ticket = (priority, next(self.tickets))
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while not (self.waiting[0] == ticket
+                           and sum(self.in_flight.values()) < self.max_concurrency
+                           and (priority == self.INTERACTIVE or self.in_flight[self.BATCH] < self.batch_concurrency)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['busy'] += 1
+                        raise AIBusyError("All AI call slots are busy")
+                    self.cond.wait(remaining)
+                heapq.heappop(self.waiting)
+                self.in_flight[priority] += 1
+            finally:
+                if ticket in self.waiting:
+                    self.waiting.remove(ticket)
+                    heapq.heapify(self.waiting)
+                self.cond.notify_all()
+
+    def _release(self, priority):
+        with self.cond:
+            self.in_flight[priority] -= 1
+            self.cond.notify_all()
+
+    # ----- circuit breaker -----
+
+    def _check_breaker(self):
+        with self.cond:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.breaker_reset or self.trial_in_flight:
+                self.counters['short_circuited'] += 1
+                raise AICircuitOpenError("AI calls are failing; retrying shortly")
+            self.trial_in_flight = True  # half-open: let this one call through
+
+    def _record_outcome(self, success):
+        with self.cond:
+            self.trial_in_flight = False
+            self.counters['calls'] += 1
+            if success:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            self.counters['failures'] += 1
+            self.consecutive_failures += 1
+            if self.opened_at is not None or self.consecutive_failures >= self.breaker_threshold:
+                if self.opened_at is None:
+                    print(f"⚠ AI circuit breaker opened after {self.consecutive_failures} failed calls")
+                self.opened_at = time.monotonic()
+
+    def breaker_state(self):
+        with self.cond:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() - self.opened_at >= self.breaker_reset else 'open'
+
+    # ----- calls -----
+
+    def available(self):
+        return self.client.available() and self.breaker_state() != 'open'
+
+    @classmethod
+    def is_retryable(cls, error):
+        if isinstance(error, (TimeoutError, ConnectionError, requests.exceptions.RequestException)):
+            return True
+        code = getattr(error, 'code', None)
+        return (code if isinstance(code, int) else getattr(code, 'value', None)) in cls.RETRYABLE_CODES
+
+    def _admit(self, priority, timeout):
+        """Checks the breaker and waits for a slot; returns the call's deadline."""
+        deadline = time.monotonic() + (timeout or self.timeouts[priority])
+        self._check_breaker()
+        try:
+            self._acquire(priority, deadline)
+        except AIBusyError:
+            with self.cond:
+                self.trial_in_flight = False
+            raise
+        return deadline
+
+    def _with_retries(self, deadline, request):
+        """Runs request(remaining_seconds), retrying transient errors with jittered backoff."""
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("AI call deadline exceeded")
+            try:
+                return request(remaining)
+            except Exception as e:
+                backoff = random.uniform(0, 0.5 * 2 ** attempt)  # full jitter
+                if attempt >= self.max_retries or not self.is_retryable(e) \
+                        or time.monotonic() + backoff >= deadline:
+                    raise
+                attempt += 1
+                with self.cond:
+                    self.counters['retries'] += 1
+                print(f"Retrying AI call in {backoff:.2f}s after: {e}")
+                time.sleep(backoff)
+
+    def generate(self, contents, priority=INTERACTIVE, timeout=None, **kwargs):
+        """Calls Gemini through the gateway. Raises an AIGatewayError or the model's last error."""
+        deadline = self._admit(priority, timeout)
+        try:
+            response = self._with_retries(deadline, lambda remaining: self.client.generate_content(
+                contents, request_options={'timeout': remaining}, **kwargs))
+        except Exception:
+            self._record_outcome(False)
+            raise
+        finally:
+            self._release(priority)
+        self._record_outcome(True)
+        return response
+
+    def stream(self, contents, priority=INTERACTIVE, timeout=None, **kwargs):
+        """Yields streamed chunks, holding a slot until the stream ends.
+
+        Retries only happen before the first chunk; once text has reached the
+        caller a failure is raised as-is.
+        """
+        def open_stream(remaining):
+            chunks = iter(self.client.generate_content(
+                contents, stream=True, request_options={'timeout': remaining}, **kwargs))
+            return chunks, next(chunks, None)
+
+        deadline = self._admit(priority, timeout)
+        try:
+            chunks, first = self._with_retries(deadline, open_stream)
+            if first is not None:
+                yield first
+            yield from chunks
+        except GeneratorExit:
+            self._record_outcome(True)  # the browser went away, not the model
+            raise
+        except Exception:
+            self._record_outcome(False)
+            raise
+        else:
+            self._record_outcome(True)
+        finally:
+            self._release(priority)
+
+    def status(self):
+        with self.cond:
+            opened_at = self.opened_at
+            return {
+                'breaker': 'closed' if opened_at is None else
+                           ('half-open' if time.monotonic() - opened_at >= self.breaker_reset else 'open'),
+                'consecutive_failures': self.consecutive_failures,
+                'in_flight': {'interactive': self.in_flight[self.INTERACTIVE], 'batch': self.in_flight[self.BATCH]},
+                'queued': len(self.waiting),
+                'max_concurrency': self.max_concurrency,
+                'batch_concurrency': self.batch_concurrency,
+                **self.counters,
+            }
+
+
+AI = AIGateway(GEMINI)
+
+
+@app.before_request
+def start_gemini_probe():
+    # Probing starts once the worker is serving, so boot never waits on the network.
+    GEMINI.start()
+
+
+# ==================== AI RESPONSE CACHES ====================
+
+IMPROVEMENT_PLAN_TTL = int(os.getenv("IMPROVEMENT_PLAN_TTL", str(7 * 24 * 3600)))
+IMPROVEMENT_PLAN_CACHE_SIZE = int(os.getenv("IMPROVEMENT_PLAN_CACHE_SIZE", "512"))
+IMPROVEMENT_PLAN_MAX_ROWS = int(os.getenv("IMPROVEMENT_PLAN_MAX_ROWS", "5000"))
+
+
+class ImprovementPlanCache:
+    """Improvement plans keyed on (job role, company, sorted job skills, sorted missing skills).
+
+    Lookups go to an in-process LRU first and then to the ImprovementPlan table,
+    which every worker shares. A plan expires ttl seconds after its row was
+    created, whichever layer serves it; the table is trimmed to max_rows by
+    least recent use whenever a new plan is stored.
+    """
+
+    def __init__(self, max_size, ttl, max_rows):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.lru = LRUCache(max_size)  # values are (plan, expires_at)
+        self.lock = threading.Lock()
+        self.db_hits = 0
+        self.generated = 0
+
+    @staticmethod
+    def normalize(job_role, company, job_skills, missing_skills):
+        clean = lambda text: ' '.join((text or '').lower().split())
+        skills = lambda items: sorted({normalize_skill(s) for s in items} - {''})
+        return clean(job_role), clean(company), skills(job_skills), skills(missing_skills)
+
+    @staticmethod
+    def key(job_role, company, job_skills, missing_skills):
+        return hashlib.sha1(json.dumps([job_role, company, job_skills, missing_skills]).encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.lru.get(key)
+        if entry is not None:
+            plan, expires_at = entry
+            if datetime.utcnow() < expires_at:
+                return plan
+            self.lru.pop(key)
+
+        row = ImprovementPlan.query.filter_by(cache_key=key).first()
+        if row is None:
+            return None
+        expires_at = row.created_at + timedelta(seconds=self.ttl)
+        if datetime.utcnow() >= expires_at:
+            db.session.delete(row)
+            db.session.commit()
+            return None
+
+        row.hits = (row.hits or 0) + 1
+        row.last_used_at = datetime.utcnow()
+        db.session.commit()
+        with self.lock:
+            self.db_hits += 1
+        # Keep the row's own expiry so a hydrated plan cannot outlive the TTL.
+        self.lru.set(key, (row.plan, expires_at))
+        return row.plan
+
+    def set(self, key, job_role, company, missing_skills, plan):
+        with self.lock:
+            self.generated += 1
+        created_at = datetime.utcnow()
+        self.lru.set(key, (plan, created_at + timedelta(seconds=self.ttl)))
+        try:
+            db.session.add(ImprovementPlan(cache_key=key, job_role=job_role[:200], company=company[:200],
+                                           missing_skills=json.dumps(missing_skills), plan=plan,
+                                           created_at=created_at))
+            db.session.commit()
+            self.evict()
+        except IntegrityError:
+            # Another worker generated the same plan concurrently.
+            db.session.rollback()
+        except Exception as e:
+            print(f"Error storing improvement plan: {e}")
+            db.session.rollback()
+
+    def evict(self):
+        """Drops expired rows, then the least recently used ones beyond max_rows."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        ImprovementPlan.query.filter(ImprovementPlan.created_at < cutoff).delete(synchronize_session=False)
+        overflow = ImprovementPlan.query.count() - self.max_rows
+        if overflow > 0:
+            stale_ids = [row.id for row in ImprovementPlan.query.with_entities(ImprovementPlan.id)
+                         .order_by(ImprovementPlan.last_used_at).limit(overflow)]
+            ImprovementPlan.query.filter(ImprovementPlan.id.in_(stale_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+    def stats(self):
+        lru = self.lru.stats()
+        with self.lock:
+            db_hits, generated = self.db_hits, self.generated
+        lookups = lru['hits'] + lru['misses']
+        return {
+            'memory': lru,
+            'db_hits': db_hits,
+            'generated': generated,
+            'hit_rate': round((lru['hits'] + db_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+IMPROVEMENT_PLANS = ImprovementPlanCache(IMPROVEMENT_PLAN_CACHE_SIZE, IMPROVEMENT_PLAN_TTL, IMPROVEMENT_PLAN_MAX_ROWS)
+
+
+CHATBOT_CACHE_SIZE = int(os.getenv("CHATBOT_CACHE_SIZE", "512"))
+CHATBOT_CACHE_THRESHOLD = float(os.getenv("CHATBOT_CACHE_THRESHOLD", "0.8"))  # see python -m benchmarks.chatbot_cache
+CHATBOT_CACHE_TTL = int(os.getenv("CHATBOT_CACHE_TTL", str(24 * 3600)))
+
+
+class SemanticAnswerCache:
+    """Chatbot answers reused for questions that are worded almost the same.
+
+    Questions are embedded as hashed word unigrams and bigrams (no fitting
+    needed) and a lookup returns the stored answer whose question has the
+    highest cosine similarity at or above the threshold. Similar wording is
+    not enough on its own: numbers, capitalised names and known company names
+    in either question must also appear in the other, so "Is 7.5 CGPA enough
+    for Google?" never answers "Is 6.5 CGPA enough for Google?". Entries are
+    evicted least recently used first and expire after ttl seconds.
+    """
+
+    def __init__(self, max_size, threshold, ttl=None, entity_names=None):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.entity_names = entity_names  # callable returning normalised names that must match exactly
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # question -> [vector, answer, key_terms, stored_at, last_used], oldest first
+        self.hits = 0
+        self.misses = 0
+        self._vectorizer = None
+        self._matrix = None  # rows in self.entries order; rebuilt only when entries are added or removed
+
+    @staticmethod
+    def normalize(message):
+        text = re.sub(r'[^\w\s.]', ' ', (message or '').lower())
+        return ' '.join(re.sub(r'(?<!\d)\.|\.(?!\d)', ' ', text).split())  # keep decimal points only
+
+    def key_terms(self, message, question):
+        """Terms that must appear in both questions: numbers, capitalised words after the first, company names."""
+        terms = set(re.findall(r'\d+(?:\.\d+)?', question))
+        words = re.findall(r'[^\W\d_][\w+#]*', message or '')
+        terms.update(word.lower() for word in words[1:] if word[0].isupper() and word != 'I')
+        padded = f' {question} '
+        if self.entity_names is not None:
+            terms.update(name for name in self.entity_names() if f' {name} ' in padded)
+        return frozenset(terms)
+
+    @staticmethod
+    def _contains_terms(question, terms):
+        padded = f' {question} '
+        return all(f' {term} ' in padded for term in terms)
+
+    FILLER_WORDS = frozenset(
+        'a an the i me my we our you your it its is are am be been do does did can could should would will '
+        'shall may might must to for of on in at from about into as any some this that these those there '
+        'please tell give get want need'.split()
+    )
+    SYNONYMS = {'which': 'what'}
+
+    def content_words(self, question):
+        """The question without filler words, plurals folded, for similarity scoring only."""
+        words = []
+        for word in question.split():
+            word = self.SYNONYMS.get(word, word)
+            if word in self.FILLER_WORDS:
+                continue
+            if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+                word = word[:-1]
+            words.append(word)
+        return ' '.join(words) or question
+
+    def _vectorize(self, text):
+        text = self.content_words(text)
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(analyzer='word', ngram_range=(1, 2), n_features=2 ** 18,
+                                                 binary=True, alternate_sign=False, norm='l2')
+        return self._vectorizer.transform([text])
+
+    def _expire(self):
+        if not self.ttl:
+            return
+        cutoff = time.monotonic() - self.ttl
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if entry[3] >= cutoff:
+                break
+            del self.entries[key]
+            self._matrix = None
+
+    def get(self, message):
+        """Returns a stored answer for a similar enough question, or None."""
+        question = self.normalize(message)
+        if not question:
+            return None
+        terms = self.key_terms(message, question)
+        vector = self._vectorize(question)
+
+        with self.lock:
+            self._expire()
+            best_key = question if question in self.entries else None
+            if best_key is None and self.entries:
+                if self._matrix is None:
+                    self._matrix = sparse.vstack([entry[0] for entry in self.entries.values()], format='csr')
+                similarities = (self._matrix @ vector.T).toarray().ravel()
+                keys = list(self.entries)
+                for row in np.argsort(-similarities):
+                    if similarities[row] < self.threshold:
+                        break
+                    candidate = keys[row]
+                    if self._contains_terms(candidate, terms) and \
+                            self._contains_terms(question, self.entries[candidate][2]):
+                        best_key = candidate
+                        break
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = self.entries[best_key]
+            entry[4] = time.monotonic()  # row order (and the matrix) stay as they are
+            return entry[1]
+
+    def set(self, message, answer):
+        question = self.normalize(message)
+        if not question or not answer:
+            return
+        terms = self.key_terms(message, question)
+        vector = self._vectorize(question)
+        with self.lock:
+            now = time.monotonic()
+            self.entries.pop(question, None)
+            self.entries[question] = [vector, answer, terms, now, now]
+            if len(self.entries) > self.max_size:
+                del self.entries[min(self.entries, key=lambda k: self.entries[k][4])]
+            self._matrix = None
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+COMPANY_NAMES = LRUCache(1, ttl=300)
+
+
+def known_company_names():
+    """Normalised names of registered companies, reloaded every five minutes."""
+    names = COMPANY_NAMES.get('names')
+    if names is None:
+        try:
+            names = frozenset(SemanticAnswerCache.normalize(name)
+                              for (name,) in db.session.query(Company.company_name)) - {''}
+        except Exception as e:
+            print(f"⚠ Could not load company names for the chatbot cache: {e}")
+            names = frozenset()
+        COMPANY_NAMES.set('names', names)
+    return names
+
+
+CHATBOT_ANSWERS = SemanticAnswerCache(CHATBOT_CACHE_SIZE, CHATBOT_CACHE_THRESHOLD, CHATBOT_CACHE_TTL,
+                                      entity_names=known_company_names)
+
+
+# ==================== CERTIFICATE ANALYSIS ====================
+
+CERTIFICATE_SKILLS_PROMPT = """
+    Analyze this certificate image.
+    Extract all relevant technical skills and also non-technical skills even smaller smaller skills need to be extract  , programming languages, software, or tools mentioned.
+    Do not extract soft skills.. ,and if the cirtificate look like resume then also extract skills from them also , 
+    Return the skills as a single, flat JSON list of strings.
+    even "outstanding gerdener" is a skill. remember this text .
+    
+    Example: ["Python", "Machine Learning", "TensorFlow", "Pandas", "Java"]
     
-    if not all_jobs:
+    If no  skills are found, return an empty list: []
+    """
+
+
+CERTIFICATE_MAX_DIMENSION = int(os.getenv("CERTIFICATE_MAX_DIMENSION", "1600"))
+CERTIFICATE_JPEG_QUALITY = int(os.getenv("CERTIFICATE_JPEG_QUALITY", "85"))
+
+
+def file_content_hash(file):
+    """sha256 of an uploaded file's bytes; leaves the stream rewound for saving."""
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(1 << 16), b''):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def save_certificate_file(file, student_id):
+    """Stores an uploaded certificate under a name derived from its content; returns (filename, content_hash).
+
+    Analysis runs later in the background and caches skills by content hash, so
+    the file on disk must never be replaced by a different upload with the same
+    original name before it is read.
+    """
+    content_hash = file_content_hash(file)
+    filename = secure_filename(f"cert_{student_id}_{content_hash[:16]}_{file.filename}")
+    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+    return filename, content_hash
+
+
+def prepare_certificate_image(path):
+    """Downscales a certificate to CERTIFICATE_MAX_DIMENSION and re-encodes it as JPEG for the model."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+        img.thumbnail((CERTIFICATE_MAX_DIMENSION, CERTIFICATE_MAX_DIMENSION))
+        buffer = BytesIO()
+        img.save(buffer, format='JPEG', quality=CERTIFICATE_JPEG_QUALITY, optimize=True)
+    return {'mime_type': 'image/jpeg', 'data': buffer.getvalue()}
+
+
+def request_certificate_skills(path):
+    """Sends one certificate image to Gemini and parses the skill list. Raises when the model fails or answers badly.
+
+    Touches no database state, so it can run on CERTIFICATE_EXECUTOR threads.
+    """
+    if not AI.available():
+        raise RuntimeError("AI analysis model is not available")
+    response = AI.generate([CERTIFICATE_SKILLS_PROMPT, prepare_certificate_image(path)], priority=AI.BATCH)
+
+    clean_response = re.sub(r'```json\s*|\s*```', '', response.text.strip())
+    skills = json.loads(clean_response)
+    return [s for s in skills if isinstance(s, str)] if isinstance(skills, list) else []
+
+
+def cache_certificate_skills(content_hash, skills):
+    """Stores extracted skills for a content hash. The caller commits."""
+    try:
+        with db.session.begin_nested():
+            db.session.add(CertificateSkillCache(content_hash=content_hash, skills=json.dumps(skills)))
+    except IntegrityError:
+        pass  # the same image was analysed concurrently
+
+
+def extract_certificate_skills(path, content_hash=None):
+    """Returns the skills on a certificate image, going to the model only for unseen images.
+
+    Results are cached by content hash, so a certificate many students upload
+    (Coursera, NPTEL...) only reaches the model once.
+    """
+    if content_hash:
+        cached = db.session.get(CertificateSkillCache, content_hash)
+        if cached is not None:
+            return json.loads(cached.skills)
+
+    skills = request_certificate_skills(path)
+    if content_hash:
+        cache_certificate_skills(content_hash, skills)
+    return skills
+
+
+def lock_student(student_id):
+    """Loads a student with SELECT ... FOR UPDATE, refreshing anything already in the session.
+
+    The row stays locked until the caller commits or rolls back, so concurrent
+    read-modify-writes of the profile (certificate jobs, profile edits) queue
+    up instead of overwriting each other.
+    """
+    return Student.query.filter_by(id=student_id).with_for_update().populate_existing().one_or_none()
+
+
+def merge_student_skills(student_id, new_skills):
+    """Adds new_skills to the student's profile; returns the skills that were not there before.
+
+    Reads the skills under a row lock, so two merges (or a merge and a profile
+    save) can't lose each other's changes. Invalidates the cached profile
+    vector and syncs the skill index when the list changes. The caller commits.
+    """
+    student = lock_student(student_id)
+    if student is None:
         return []
+    current_skills_list = parse_skills(student.skills)
+    current_skills_set = {s.lower().strip() for s in current_skills_list}
+    new_skills_set = {s.lower().strip() for s in new_skills} - {''}
+
+    final_skills_list = sorted([s.title() for s in current_skills_set.union(new_skills_set)])
+    if final_skills_list != current_skills_list:
+        STUDENT_VECTORS.invalidate(student.id)
+        sync_student_skills(student.id, final_skills_list)
+    student.skills = json.dumps(final_skills_list)
+    return sorted(s.title() for s in new_skills_set - current_skills_set)
+
+
+def process_certificate(certificate_id, link=None):
+    """Background job: extracts skills from an uploaded certificate and merges them into the profile."""
+    certificate = Certificate.query.get(certificate_id)
+    if certificate is None:
+        return
+    certificate.analysis_status = 'processing'
+    certificate.analyzed_at = datetime.utcnow()  # marks the attempt; see requeue_stale_certificates
+    db.session.commit()
+    print(f"🔍 Certificate {certificate_id}: extracting skills")
 
     try:
-        student_skills_list = json.loads(student.skills) if student.skills else []
-    except (json.JSONDecodeError, TypeError):
-        student_skills_list = []
-    student_skills_set = {s.lower().strip() for s in student_skills_list}
+        found_skills = extract_certificate_skills(os.path.join(app.config['UPLOAD_FOLDER'], certificate.filename),
+                                                  certificate.content_hash)
+    except Exception as e:
+        if isinstance(e, json.JSONDecodeError):
+            print("Gemini response was not valid JSON.")
+        print(f"❌ Certificate {certificate_id}: analysis failed: {e}")
+        db.session.rollback()
+        certificate.analysis_status = 'failed'
+        certificate.analysis_error = str(e)[:300]
+        certificate.analyzed_at = datetime.utcnow()
+        db.session.commit()
+        create_notification(certificate.student_id, 'student', 'Certificate analysis failed',
+                            f"We couldn't read skills from '{certificate.title}'. The certificate is still saved.", link)
+        return
+
+    added_skills = merge_student_skills(certificate.student_id, found_skills)
+    certificate.analysis_status = 'done'
+    certificate.skills_found = json.dumps(added_skills)
+    certificate.analyzed_at = datetime.utcnow()
+    db.session.commit()
+    print(f"✅ Certificate {certificate_id}: {len(found_skills)} skills found, {len(added_skills)} new")
+
+    if added_skills:
+        message = f"{len(added_skills)} new skills from '{certificate.title}' were added to your profile: {', '.join(added_skills)}."
+    else:
+        message = f"'{certificate.title}' was analysed. No new skills were detected."
+    create_notification(certificate.student_id, 'student', 'Certificate analysed', message, link)
+
+
+CERTIFICATE_STALE_AFTER = int(os.getenv("CERTIFICATE_STALE_AFTER", "600"))
+_stale_certificates_checked = threading.Event()
+
+
+def requeue_stale_certificates():
+    """Restarts analysis of certificates left pending or processing by a worker that went away.
+
+    A certificate counts as stale once its last attempt (analyzed_at, or the
+    upload time if it never started) is CERTIFICATE_STALE_AFTER seconds old.
+    Each one is claimed with a conditional UPDATE that moves the timestamp
+    forward, so when several workers boot together only one requeues it.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=CERTIFICATE_STALE_AFTER)
+    last_attempt = db.func.coalesce(Certificate.analyzed_at, Certificate.uploaded_at)
+    stale_ids = [certificate_id for (certificate_id,) in db.session.query(Certificate.id).filter(
+        Certificate.analysis_status.in_(['pending', 'processing']), last_attempt < cutoff)]
+
+    requeued = []
+    for certificate_id in stale_ids:
+        claimed = Certificate.query.filter(Certificate.id == certificate_id,
+                                           Certificate.analysis_status.in_(['pending', 'processing']),
+                                           last_attempt < cutoff)\
+            .update({'analysis_status': 'pending', 'analyzed_at': datetime.utcnow()}, synchronize_session=False)
+        if claimed:
+            requeued.append(certificate_id)
+    db.session.commit()
+
+    for certificate_id in requeued:
+        run_in_background(process_certificate, certificate_id)
+    if requeued:
+        print(f"⚠ Requeued {len(requeued)} certificates left unfinished by a previous run")
+
+
+@app.before_request
+def requeue_stale_certificates_once():
+    # Runs on the first request of each worker, off the request thread.
+    if not _stale_certificates_checked.is_set():
+        _stale_certificates_checked.set()
+        run_in_background(requeue_stale_certificates)
+
+
+CERTIFICATE_ANALYSIS_WORKERS = int(os.getenv("CERTIFICATE_ANALYSIS_WORKERS", "4"))
+CERTIFICATE_BULK_LIMIT = int(os.getenv("CERTIFICATE_BULK_LIMIT", "20"))
+# Bounds concurrent model calls for bulk uploads across the whole worker process.
+CERTIFICATE_EXECUTOR = ThreadPoolExecutor(max_workers=CERTIFICATE_ANALYSIS_WORKERS, thread_name_prefix='elevatr-cert')
 
-    student_projects_text = ' '.join([p.description for p in student.projects if p.description])
-    student_doc = f"{' '.join(student_skills_list)} {student_projects_text}"
 
-    job_docs = []
-    for job in all_jobs:
-        skills = ' '.join(json.loads(job.required_skills) if job.required_skills else [])
-        job_doc = f"{job.job_role} {job.description} {skills}"
-        job_docs.append(job_doc)
+def process_certificate_batch(certificate_ids, link=None):
+    """Background job for a bulk upload.
+
+    Distinct images missing from the skill cache are analysed concurrently on
+    CERTIFICATE_EXECUTOR; everything found is then merged into the profile in
+    one transaction together with the certificate statuses and a single
+    StudentProgress snapshot. That transaction takes the student row lock
+    before touching any certificate, the same order process_certificate
+    uses, so batches, single uploads and profile edits serialise cleanly.
+    """
+    certificates = Certificate.query.filter(Certificate.id.in_(certificate_ids)).order_by(Certificate.id).all()
+    if not certificates:
+        return
+    student_id = certificates[0].student_id
+    for certificate in certificates:
+        certificate.analysis_status = 'processing'
+    db.session.commit()
+    print(f"🔍 Bulk upload for student {student_id}: analysing {len(certificates)} certificates")
+
+    keys = {certificate.id: certificate.content_hash or f"certificate-{certificate.id}" for certificate in certificates}
+    hashes = {certificate.content_hash for certificate in certificates if certificate.content_hash}
+    results = {row.content_hash: json.loads(row.skills) for row in
+               CertificateSkillCache.query.filter(CertificateSkillCache.content_hash.in_(hashes))} if hashes else {}
+
+    futures = {}
+    for certificate in certificates:
+        key = keys[certificate.id]
+        if key not in results and key not in futures:
+            path = os.path.join(app.config['UPLOAD_FOLDER'], certificate.filename)
+            futures[key] = CERTIFICATE_EXECUTOR.submit(request_certificate_skills, path)
+
+    errors = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+            if key in hashes:
+                cache_certificate_skills(key, results[key])
+        except Exception as e:
+            print(f"❌ Certificate analysis failed ({key[:12]}): {e}")
+            errors[key] = e
 
     try:
-        tfidf_vectorizer = TfidfVectorizer(stop_words='english')
-        corpus = [student_doc] + job_docs
-        tfidf_matrix = tfidf_vectorizer.fit_transform(corpus)
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
-        content_scores = cosine_sim[0]
-    except ValueError:
-        content_scores = [0] * len(all_jobs)
-
-    recommendations = []
-    num_projects = len(student.projects)
-
-    for i, job in enumerate(all_jobs):
-        if job.id not in applied_job_ids:
-            content_score = content_scores[i] * 70
-            cgpa_score = 0
-            if student.cgpa and student.cgpa >= job.cgpa_required:
-                cgpa_score = 10 
-            project_score = min(num_projects * 10, 20)
-            total_score = content_score + cgpa_score + project_score
-            
-            roadmap = []                                          # youtube    links    start
+        if lock_student(student_id) is None:  # locking read: sees the latest profile, held until commit
+            return
+        found_skills = [skill for key in set(keys.values()) if key in results for skill in results[key]]
+        added_skills = merge_student_skills(student_id, found_skills)
+        added_lower = {skill.lower(): skill for skill in added_skills}
+        for certificate in certificates:
+            key = keys[certificate.id]
+            certificate.analyzed_at = datetime.utcnow()
+            if key in errors:
+                certificate.analysis_status = 'failed'
+                certificate.analysis_error = str(errors[key])[:300]
+            else:
+                certificate.analysis_status = 'done'
+                own = {skill.lower().strip() for skill in results[key]}
+                certificate.skills_found = json.dumps(sorted(added_lower[s] for s in own if s in added_lower))
+        log_student_progress(student_id)
+        db.session.commit()
+    except Exception as e:
+        print(f"Error saving bulk certificate analysis: {e}")
+        db.session.rollback()
+        Certificate.query.filter(Certificate.id.in_(certificate_ids)).update(
+            {'analysis_status': 'failed', 'analysis_error': 'Could not save the extracted skills'},
+            synchronize_session=False)
+        db.session.commit()
+        create_notification(student_id, 'student', 'Certificate analysis failed',
+                            "We couldn't save the skills from your uploaded certificates. Please try again.", link)
+        return
+
+    failed = sum(1 for certificate in certificates if keys[certificate.id] in errors)
+    print(f"✅ Bulk upload for student {student_id}: {len(added_skills)} new skills, {failed} failed, "
+          f"{len(futures)} model calls for {len(certificates)} certificates")
+
+    message = f"{len(certificates) - failed} of {len(certificates)} certificates analysed."
+    if added_skills:
+        message += f" {len(added_skills)} new skills were added to your profile: {', '.join(added_skills)}."
+    else:
+        message += " No new skills were detected."
+    create_notification(student_id, 'student', 'Certificates analysed', message, link)
+
+
+# ==================== SKILL INDEX ====================
+
+def normalize_skill(name):
+    return name.lower().strip() if isinstance(name, str) else ''
+
+
+def get_skill_ids(names, create=False):
+    """Maps skill names to Skill ids, optionally creating the ones not seen before."""
+    normalized = {normalize_skill(n) for n in names} - {''}
+    if not normalized:
+        return set()
+
+    known = dict(db.session.query(Skill.name, Skill.id).filter(Skill.name.in_(normalized)).all())
+    if create:
+        for name in normalized - set(known):
             try:
-                job_skills_list = json.loads(job.required_skills) if job.required_skills else []
-            except (json.JSONDecodeError, TypeError):
-                job_skills_list = []
-                
-            job_skills_set = {s.lower().strip() for s in job_skills_list}
-            missing_skills = list(job_skills_set - student_skills_set)
-            
-            for skill in missing_skills:
-                resource_link = SKILL_RESOURCES.get(skill)
-                if resource_link:
-                    roadmap.append({
-                        'skill': skill.capitalize(), 
-                        'link': resource_link
-                    })
+                with db.session.begin_nested():
+                    skill = Skill(name=name)
+                    db.session.add(skill)
+                known[name] = skill.id
+            except IntegrityError:
+                # Another request created it first.
+                known[name] = Skill.query.filter_by(name=name).first().id
+    return set(known.values())
+
+
+def sync_student_skills(student_id, skills_list):
+    """Rewrites a student's StudentSkill rows; the caller commits."""
+    skill_ids = get_skill_ids(skills_list, create=True)
+    StudentSkill.query.filter_by(student_id=student_id).delete()
+    db.session.add_all([StudentSkill(student_id=student_id, skill_id=skill_id) for skill_id in skill_ids])
+
+
+def sync_job_skills(job_id, skills_list):
+    """Rewrites a job's JobSkill rows; the caller commits."""
+    skill_ids = get_skill_ids(skills_list, create=True)
+    JobSkill.query.filter_by(job_id=job_id).delete()
+    db.session.add_all([JobSkill(job_id=job_id, skill_id=skill_id) for skill_id in skill_ids])
+
+
+def jobs_requiring_skill(name):
+    return JobPosting.query.join(JobSkill, JobSkill.job_id == JobPosting.id)\
+        .join(Skill, Skill.id == JobSkill.skill_id)\
+        .filter(Skill.name == normalize_skill(name))
+
+
+def build_roadmaps(student_id, job_ids):
+    """Returns {job_id: roadmap} listing learning resources for each job's missing skills."""
+    student_skill_ids = {skill_id for (skill_id,) in
+                         db.session.query(StudentSkill.skill_id).filter_by(student_id=student_id)}
+    job_skill_ids = defaultdict(set)
+    for job_id, skill_id in db.session.query(JobSkill.job_id, JobSkill.skill_id).filter(JobSkill.job_id.in_(job_ids)):
+        job_skill_ids[job_id].add(skill_id)
+    resource_skills = dict(db.session.query(Skill.id, Skill.name).filter(Skill.name.in_(list(SKILL_RESOURCES))).all())
+
+    roadmaps = {}
+    for job_id in job_ids:
+        missing_skill_ids = job_skill_ids[job_id] - student_skill_ids
+        roadmaps[job_id] = [
+            {'skill': resource_skills[skill_id].capitalize(), 'link': SKILL_RESOURCES[resource_skills[skill_id]]}
+            for skill_id in sorted(missing_skill_ids) if skill_id in resource_skills
+        ]
+    return roadmaps
 
-            if total_score > 25:
-                 recommendations.append({
-                     'job': job, 
-                     'score': round(total_score, 2),
-                     'roadmap': roadmap  
-                 })
-                                                                    # youtube end here 
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
-    return recommendations[:5]
 
+# ==================== RECOMMENDATION ENGINE ====================
+
+JOB_INDEX_REFIT_INTERVAL = int(os.getenv("JOB_INDEX_REFIT_INTERVAL", "600"))
+# With several worker processes (gunicorn), publish the job matrix to disk once
+# and let every worker memory-map it instead of fitting and holding its own copy.
+SHARED_JOB_INDEX = os.getenv("SHARED_JOB_INDEX", "false").lower() == "true"
+JOB_INDEX_DIR = os.getenv("JOB_INDEX_DIR") or os.path.join(app.instance_path, 'job_index')
+JOB_INDEX_KEEP_GENERATIONS = 2
+
+
+def parse_skills(raw):
+    """Decodes a JSON skills column, tolerating empty or malformed values."""
+    try:
+        skills = json.loads(raw) if raw else []
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return skills if isinstance(skills, list) else []
+
+
+def build_job_document(job):
+    return f"{job.job_role} {job.description} {' '.join(parse_skills(job.required_skills))}"
+
+
+def build_student_document(student, project_descriptions=None):
+    if project_descriptions is None:
+        project_descriptions = [p.description for p in student.projects]
+    student_projects_text = ' '.join([d for d in project_descriptions if d])
+    return f"{' '.join(parse_skills(student.skills))} {student_projects_text}"
+
+
+class JobIndexSnapshot(namedtuple('JobIndexSnapshot', 'generation vectorizer matrix rows')):
+    """One consistent view of the job index.
+
+    A refit swaps the vocabulary, matrix and row map together, so anything that
+    vectorises a document and scores it against jobs must use a single snapshot
+    for both; mixing two generations gives dimension errors or wrong scores.
+    """
+
+    def transform(self, documents):
+        """Vectorises documents against this vocabulary, or returns None before the first fit."""
+        return self.vectorizer.transform(documents) if self.vectorizer is not None else None
+
+    def job_matrix(self, jobs):
+        """One row per job, in order; jobs posted by another worker since our last refit are transformed."""
+        job_rows = [self.rows.get(job.id) for job in jobs]
+        if all(row is not None for row in job_rows):
+            return self.matrix[job_rows]
+        return sparse.vstack([self.matrix[[row]] if row is not None else self.transform([build_job_document(job)])
+                              for job, row in zip(jobs, job_rows)], format='csr')
+
+    def score_jobs(self, vector, jobs):
+        """Cosine similarity of one document vector against the given jobs, in order."""
+        if vector is None or not jobs or self.matrix is None:
+            return np.zeros(len(jobs))
+        return (self.job_matrix(jobs) @ vector.T).toarray().ravel()
+
+
+class JobIndex:
+    """TF-IDF vectors for every job posting, fitted once and patched as jobs come and go.
+
+    Rows are L2-normalised, so one sparse dot product against a student vector
+    gives the cosine similarity with every job. Postings added between refits are
+    transformed with the current vocabulary; a background thread refits the whole
+    corpus on a schedule once the table has changed.
+
+    When shared_dir is set the index is published there as numbered generations
+    (CSR arrays, idf weights and vocabulary) behind a CURRENT pointer. Workers map
+    the arrays read-only, so the page cache holds a single copy, and switch to a
+    new generation as soon as CURRENT moves. Only one process writes at a time.
+    """
+
+    def __init__(self, refit_interval=JOB_INDEX_REFIT_INTERVAL, shared_dir=None):
+        self.refit_interval = refit_interval
+        self.shared_dir = shared_dir
+        self.lock = threading.RLock()
+        self.vectorizer = None
+        self.matrix = None
+        self.rows = {}
+        self.signature = None
+        self.generation = None
+        self.shared_generation = None
+        self.built_at = None
+        self._current_stamp = None
+        self._scheduler = None
+
+    def _table_signature(self):
+        count, max_id = db.session.query(db.func.count(JobPosting.id), db.func.max(JobPosting.id)).one()
+        return (count, max_id)
+
+    def _fit(self):
+        jobs = JobPosting.query.with_entities(
+            JobPosting.id, JobPosting.job_role, JobPosting.description, JobPosting.required_skills
+        ).order_by(JobPosting.id).all()
+
+        vectorizer, matrix, generation = None, None, None
+        if jobs:
+            try:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                vectorizer = TfidfVectorizer(stop_words='english')
+                matrix = vectorizer.fit_transform([build_job_document(job) for job in jobs]).tocsr()
+                # Identical corpora produce identical generations, so persisted
+                # student vectors survive restarts until the vocabulary moves.
+                vocabulary = json.dumps(sorted(vectorizer.vocabulary_.items())).encode()
+                generation = hashlib.sha1(vocabulary + vectorizer.idf_.tobytes()).hexdigest()
+            except ValueError:
+                vectorizer, matrix = None, None
+        job_ids = [job.id for job in jobs] if matrix is not None else []
+        return vectorizer, matrix, job_ids, generation
+
+    def refit(self):
+        if self.shared_dir:
+            with self._writer_lock():
+                signature = self._table_signature()
+                published = self._published_generation()
+                # Another worker may have rebuilt for the same table state while we waited.
+                if published is None or self._read_meta(published)['signature'] != list(signature):
+                    previous = self._read_meta(published)['generation'] if published is not None else None
+                    vectorizer, matrix, job_ids, generation = self._fit()
+                    published = self._publish(vectorizer, matrix, job_ids, signature, generation)
+                    # Only the worker that publishes schedules the recompute.
+                    self._vocabulary_changed(previous, generation)
+                self._load(published)
+            return
+
+        signature = self._table_signature()
+        vectorizer, matrix, job_ids, generation = self._fit()
+        with self.lock:
+            previous = self.generation
+            self.vectorizer = vectorizer
+            self.matrix = matrix
+            self.rows = {job_id: i for i, job_id in enumerate(job_ids)}
+            self.signature = signature
+            self.generation = generation
+            self.built_at = datetime.utcnow()
+        self._vocabulary_changed(previous, generation)
+
+    @staticmethod
+    def _vocabulary_changed(previous, generation):
+        """Stored fit scores were computed against the old vocabulary; rebuild the stale columns in the background.
+
+        Generations are content hashes, so workers that refit the same table
+        agree on them and only the first sweep to run finds anything to rebuild.
+        """
+        if previous is not None and generation != previous:
+            queue_stale_fit_refresh()
+
+    def ensure_built(self):
+        if self.shared_dir:
+            # Not under self.lock: waiting on another process's writer lock while
+            # holding it would stall every request thread in this worker.
+            self._sync_shared()
+            if self.built_at is None:
+                self.refit()
+        with self.lock:
+            if self.built_at is None:
+                self.refit()
+            if self._scheduler is None and self.refit_interval > 0:
+                self._scheduler = threading.Thread(target=self._refit_loop, name='job-index-refit', daemon=True)
+                self._scheduler.start()
+
+    def _refit_loop(self):
+        while True:
+            time.sleep(self.refit_interval)
+            try:
+                with app.app_context():
+                    if self._table_signature() != self.signature:
+                        self.refit()
+            except Exception as e:
+                print(f"Job index refit failed: {e}")
+
+    def add_job(self, job):
+        """Appends a freshly posted job; unseen terms only count after the next refit."""
+        if self.shared_dir:
+            with self._writer_lock():
+                self._sync_shared()
+                if self.built_at is None or self.vectorizer is None:
+                    return
+                row = self.vectorizer.transform([build_job_document(job)])
+                matrix = sparse.vstack([self.matrix, row], format='csr')
+                job_ids = self._job_ids() + [job.id]
+                self._load(self._publish(self.vectorizer, matrix, job_ids, self.signature, self.generation))
+            return
+
+        with self.lock:
+            if self.built_at is None or self.vectorizer is None:
+                return
+            row = self.vectorizer.transform([build_job_document(job)])
+            rows = dict(self.rows)
+            rows[job.id] = self.matrix.shape[0]
+            self.matrix = sparse.vstack([self.matrix, row], format='csr')
+            self.rows = rows
+
+    def remove_job(self, job_id):
+        """Drops a job from lookups; its row is compacted away on the next refit."""
+        if self.shared_dir:
+            with self._writer_lock():
+                self._sync_shared()
+                if job_id not in self.rows:
+                    return
+                job_ids = [-1 if existing == job_id else existing for existing in self._job_ids()]
+                self._load(self._publish(self.vectorizer, self.matrix, job_ids, self.signature, self.generation))
+            return
+
+        with self.lock:
+            if job_id in self.rows:
+                rows = dict(self.rows)
+                del rows[job_id]
+                self.rows = rows
+
+    def _job_ids(self):
+        """Job id per matrix row, with -1 marking rows of deleted jobs."""
+        job_ids = [-1] * (self.matrix.shape[0] if self.matrix is not None else 0)
+        for job_id, row in self.rows.items():
+            job_ids[row] = job_id
+        return job_ids
+
+    # ----- shared on-disk generations -----
+
+    def _generation_dir(self, generation):
+        return os.path.join(self.shared_dir, f'gen-{generation}')
+
+    def _published_generation(self):
+        try:
+            with open(os.path.join(self.shared_dir, 'CURRENT')) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _read_meta(self, generation):
+        with open(os.path.join(self._generation_dir(generation), 'meta.json')) as f:
+            return json.load(f)
+
+    @contextmanager
+    def _writer_lock(self):
+        """Serialises writers across processes, or just across threads where flock is unavailable."""
+        os.makedirs(self.shared_dir, exist_ok=True)
+        if fcntl is None:
+            with self.lock:
+                yield
+            return
+        with open(os.path.join(self.shared_dir, 'write.lock'), 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _publish(self, vectorizer, matrix, job_ids, signature, vocabulary_generation):
+        """Writes a new generation next to the live one and flips CURRENT to it. Caller holds the writer lock."""
+        generation = (self._published_generation() or 0) + 1
+        target = self._generation_dir(generation)
+        staging = target + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(staging)
+
+        meta = {
+            'signature': list(signature) if signature is not None else None,
+            'generation': vocabulary_generation,
+            'shape': list(matrix.shape) if matrix is not None else None,
+            'published_at': datetime.utcnow().isoformat(),
+        }
+        if matrix is not None:
+            np.save(os.path.join(staging, 'data.npy'), matrix.data)
+            np.save(os.path.join(staging, 'indices.npy'), matrix.indices)
+            np.save(os.path.join(staging, 'indptr.npy'), matrix.indptr)
+            np.save(os.path.join(staging, 'job_ids.npy'), np.asarray(job_ids, dtype=np.int64))
+            np.save(os.path.join(staging, 'idf.npy'), vectorizer.idf_)
+            with open(os.path.join(staging, 'vocabulary.json'), 'w') as f:
+                json.dump({term: int(column) for term, column in vectorizer.vocabulary_.items()}, f)
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        os.rename(staging, target)
+
+        pointer = os.path.join(self.shared_dir, 'CURRENT.tmp')
+        with open(pointer, 'w') as f:
+            f.write(str(generation))
+        os.replace(pointer, os.path.join(self.shared_dir, 'CURRENT'))
+
+        # Workers still mapping an older generation keep their pages until they
+        # switch over, so unlinking the files underneath them is safe.
+        for old in range(generation - JOB_INDEX_KEEP_GENERATIONS, 0, -1):
+            if not os.path.isdir(self._generation_dir(old)):
+                break
+            shutil.rmtree(self._generation_dir(old), ignore_errors=True)
+        return generation
+
+    def _load(self, generation):
+        """Maps a published generation read-only and swaps it in."""
+        path = self._generation_dir(generation)
+        meta = self._read_meta(generation)
+        vectorizer, matrix, rows = None, None, {}
+        if meta['shape'] is not None:
+            arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                      for name in ('data', 'indices', 'indptr', 'job_ids', 'idf')}
+            with open(os.path.join(path, 'vocabulary.json')) as f:
+                vocabulary = json.load(f)
+            matrix = sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                                       shape=tuple(meta['shape']), copy=False)
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            vectorizer = TfidfVectorizer(stop_words='english', vocabulary=vocabulary)
+            vectorizer.idf_ = np.asarray(arrays['idf'])
+            rows = {int(job_id): i for i, job_id in enumerate(arrays['job_ids']) if job_id >= 0}
+
+        with self.lock:
+            self.vectorizer = vectorizer
+            self.matrix = matrix
+            self.rows = rows
+            self.signature = tuple(meta['signature']) if meta['signature'] is not None else None
+            self.generation = meta['generation']
+            self.shared_generation = generation
+            self.built_at = datetime.utcnow()
+
+    def _sync_shared(self):
+        """Switches to the newest published generation if another process has moved CURRENT."""
+        try:
+            stat = os.stat(os.path.join(self.shared_dir, 'CURRENT'))
+        except OSError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._current_stamp:
+            return
+        published = self._published_generation()
+        if published is None or published == self.shared_generation:
+            self._current_stamp = stamp
+            return
+        try:
+            self._load(published)
+            self._current_stamp = stamp
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not map job index generation {published}: {e}")
+
+    def snapshot(self):
+        """Returns the current JobIndexSnapshot, building the index first if needed.
+
+        Every writer swaps the fields under self.lock (and replaces rather than
+        mutates the matrix and row map), so the tuple read here is consistent.
+        """
+        self.ensure_built()
+        with self.lock:
+            return JobIndexSnapshot(self.generation, self.vectorizer, self.matrix, self.rows)
+
+
+JOB_INDEX = JobIndex(shared_dir=JOB_INDEX_DIR if SHARED_JOB_INDEX else None)
+
+
+class StudentVectorCache:
+    """Per-student profile vectors, reused until the profile or the job vocabulary changes.
+
+    Entries live in an in-process LRU and, when PERSIST_STUDENT_VECTORS is set, in
+    the StudentVector table. Every entry records the profile version it was built
+    from, and each lookup reads the current versions from the database, so an edit
+    made through any worker is picked up on the next request. invalidate() only
+    frees the entry early and triggers the fit score refresh.
+    """
+
+    def __init__(self, max_size):
+        self.lru = LRUCache(max_size)
+
+    def get(self, student, index):
+        """Returns (vector, project_count) for one student."""
+        return self.get_many([student], index).get(student.id, (None, 0))
+
+    @staticmethod
+    def profile_versions(students):
+        """Returns {student_id: hash of the skills and project ids the document is built from}.
+
+        Projects are only ever added or deleted, so their ids stand in for their text.
+        """
+        project_ids = defaultdict(list)
+        for student_id, project_id in db.session.query(StudentProject.student_id, StudentProject.id)\
+                .filter(StudentProject.student_id.in_([s.id for s in students])):
+            project_ids[student_id].append(project_id)
+        return {
+            s.id: hashlib.sha1(json.dumps([s.skills or '', sorted(project_ids[s.id])]).encode()).hexdigest()
+            for s in students
+        }
+
+    def get_many(self, students, index):
+        """Returns {student_id: (vector, project_count)}, vectorising all misses in one pass.
+
+        index is the JobIndexSnapshot the caller will score with: entries are
+        keyed on its generation and misses are transformed with its vocabulary.
+        """
+        generation = index.generation
+        if generation is None:
+            return {}
+
+        versions = self.profile_versions(students)
+        found, missing = {}, []
+        for student in students:
+            cached = self.lru.get(student.id)
+            if cached is not None and cached[:2] == (generation, versions[student.id]):
+                found[student.id] = cached[2:]
+            else:
+                missing.append(student)
+
+        persist = app.config['PERSIST_STUDENT_VECTORS']
+        if missing and persist:
+            stored = StudentVector.query.filter(
+                StudentVector.student_id.in_([s.id for s in missing]),
+                StudentVector.generation == generation
+            ).all()
+            width = len(index.vectorizer.vocabulary_)
+            for row in stored:
+                if row.profile_version != versions[row.student_id]:
+                    continue
+                indices = json.loads(row.indices)
+                vector = sparse.csr_matrix((json.loads(row.weights), indices, [0, len(indices)]), shape=(1, width))
+                found[row.student_id] = (vector, row.project_count or 0)
+                self.lru.set(row.student_id, (generation, row.profile_version, vector, row.project_count or 0))
+            missing = [s for s in missing if s.id not in found]
+
+        if not missing:
+            return found
+
+        project_descriptions = defaultdict(list)
+        for student_id, description in db.session.query(StudentProject.student_id, StudentProject.description)\
+                .filter(StudentProject.student_id.in_([s.id for s in missing])):
+            project_descriptions[student_id].append(description)
+
+        matrix = index.transform([build_student_document(s, project_descriptions[s.id]) for s in missing])
+        if matrix is None:
+            return found
+
+        for i, student in enumerate(missing):
+            vector = matrix[i]
+            project_count = len(project_descriptions[student.id])
+            found[student.id] = (vector, project_count)
+            self.lru.set(student.id, (generation, versions[student.id], vector, project_count))
+            if persist:
+                db.session.merge(StudentVector(
+                    student_id=student.id,
+                    generation=generation,
+                    profile_version=versions[student.id],
+                    indices=json.dumps(vector.indices.tolist()),
+                    weights=json.dumps(vector.data.tolist()),
+                    project_count=project_count
+                ))
+        if persist:
+            try:
+                db.session.commit()
+            except Exception as e:
+                print(f"Error persisting student vectors: {e}")
+                db.session.rollback()
+        return found
+
+    def invalidate(self, student_id):
+        """Drops a student's vector; the caller commits the surrounding transaction.
+
+        Once that commit lands the student's precomputed fit scores are refreshed.
+        """
+        self.lru.pop(student_id)
+        mark_fit_scores_stale(student_id)
+        if app.config['PERSIST_STUDENT_VECTORS']:
+            StudentVector.query.filter_by(student_id=student_id).delete()
+
+
+STUDENT_VECTORS = StudentVectorCache(app.config['STUDENT_VECTOR_CACHE_SIZE'])
+
+
+RECOMMENDATION_LIMIT = 5
+RECOMMENDATION_MIN_SCORE = 25
+
+
+def recommendation_candidates(student, location=None, eligible_only=False):
+    """Candidate generation for get_recommendations, done entirely in SQL.
+
+    Jobs the student has applied to are excluded with a subquery, and the
+    optional location / CGPA constraints narrow the set further. Only the
+    columns needed to score a job are loaded.
+    """
+    applied_job_ids = db.session.query(JobApplication.job_id).filter(JobApplication.student_id == student.id)
+    query = db.session.query(
+        JobPosting.id, JobPosting.job_role, JobPosting.description,
+        JobPosting.required_skills, JobPosting.cgpa_required
+    ).filter(JobPosting.id.notin_(applied_job_ids))
+
+    if location:
+        query = query.filter(JobPosting.location == location)
+    if eligible_only:
+        query = query.filter(JobPosting.cgpa_required <= (student.cgpa or 0))
+    return query.order_by(JobPosting.id).all()
+
+
+def get_recommendations(student_id, location=None, eligible_only=False, limit=RECOMMENDATION_LIMIT):
+    student = Student.query.get(student_id)
+    if not student:
+        return []
+
+    candidates = recommendation_candidates(student, location=location, eligible_only=eligible_only)
+    if not candidates:
+        return []
+
+    index = JOB_INDEX.snapshot()
+    student_vector, num_projects = STUDENT_VECTORS.get(student, index)
+    content_scores = index.score_jobs(student_vector, candidates) * 70
+    project_score = min(num_projects * 10, 20)
+
+    scored = []
+    for job, content_score in zip(candidates, content_scores):
+        cgpa_score = 0
+        if student.cgpa and student.cgpa >= job.cgpa_required:
+            cgpa_score = 10
+        total_score = content_score + cgpa_score + project_score
+        if total_score > RECOMMENDATION_MIN_SCORE:
+            scored.append((round(total_score, 2), job.id))
+
+    top = heapq.nlargest(limit, scored, key=lambda item: item[0])
+    jobs = {job.id: job for job in JobPosting.query.filter(JobPosting.id.in_([job_id for _, job_id in top]))} if top else {}
+    recommendations = [{'job': jobs[job_id], 'score': score} for score, job_id in top if job_id in jobs]
+
+    # youtube links for the skills each recommended job needs and the student lacks
+    roadmaps = build_roadmaps(student.id, [rec['job'].id for rec in recommendations])
+    for rec in recommendations:
+        rec['roadmap'] = roadmaps[rec['job'].id]
+    return recommendations
+
+
+def student_profile_fingerprint(student, project_descriptions=None):
+    """Hash of every profile field that feeds a recommendation score."""
+    if project_descriptions is None:
+        project_descriptions = [p.description for p in student.projects]
+    payload = json.dumps([student.skills or '', student.cgpa or 0.0, sorted(d or '' for d in project_descriptions)])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def latest_job_id():
+    return db.session.query(db.func.max(JobPosting.id)).scalar() or 0
+
+
+def save_recommendations(student_id, profile_hash, ranked_jobs, newest_job_id):
+    """Replaces a student's stored recommendations with (job_id, score, roadmap) rows.
+
+    Also records a RecommendationRun marker, which is what lets an empty list be
+    served from the store. newest_job_id must be read before the ranking was
+    computed, never at save time. The caller commits.
+    """
+    db.session.merge(RecommendationRun(student_id=student_id, profile_hash=profile_hash,
+                                       latest_job_id=newest_job_id, computed_at=datetime.utcnow()))
+    Recommendation.query.filter_by(student_id=student_id).delete()
+    db.session.add_all([
+        Recommendation(
+            student_id=student_id,
+            job_id=job_id,
+            rank=rank,
+            score=float(score),
+            roadmap=json.dumps(roadmap),
+            profile_hash=profile_hash
+        )
+        for rank, (job_id, score, roadmap) in enumerate(ranked_jobs)
+    ])
+
+
+def get_cached_recommendations(student):
+    """Serves stored recommendations, recomputing live only if the profile changed.
+
+    Stored lists are also discarded when a recommended job has since been applied
+    to or deleted; the fresh result is written back for the next view. An empty
+    result stays cached, via its RecommendationRun marker, until the profile
+    changes or a new job is posted.
+    """
+    profile_hash = student_profile_fingerprint(student)
+    stored = Recommendation.query.options(joinedload(Recommendation.job))\
+        .filter_by(student_id=student.id).order_by(Recommendation.rank).all()
+
+    applied_job_ids = {app.job_id for app in student.applications}
+    if stored and all(rec.profile_hash == profile_hash and rec.job is not None
+                      and rec.job_id not in applied_job_ids for rec in stored):
+        return [{'job': rec.job, 'score': rec.score, 'roadmap': json.loads(rec.roadmap or '[]')} for rec in stored]
+    newest_job_id = latest_job_id()
+    if not stored:
+        run = db.session.get(RecommendationRun, student.id)
+        if run is not None and run.profile_hash == profile_hash and run.latest_job_id >= newest_job_id:
+            return []
+
+    recommendations = get_recommendations(student.id)
+    try:
+        save_recommendations(student.id, profile_hash,
+                             [(rec['job'].id, rec['score'], rec['roadmap']) for rec in recommendations],
+                             newest_job_id)
+        db.session.commit()
+    except Exception as e:
+        print(f"Error storing recommendations: {e}")
+        db.session.rollback()
+    return recommendations
+
+
+def get_fit_scores_for_job(job, student_ids):
+    """Scores many students against one job with a single matrix product.
+
+    Returns {student_id: fit score}. Students are loaded in one query; profile
+    vectors come from the cache, with any misses vectorised together in one pass.
+    """
+    if not student_ids:
+        return {}
+
+    students = Student.query.filter(Student.id.in_(set(student_ids))).all()
+    if not students:
+        return {}
+
+    scores = score_students_against_jobs(students, [job], JOB_INDEX.snapshot())
+    return {student.id: float(score) for student, score in zip(students, scores[:, 0])}
+
+
+def score_students_against_jobs(students, jobs, index):
+    """Fit scores of every student against every job, as a len(students) x len(jobs) array.
+
+    Each student is vectorised once (through the cache) and the content scores
+    come from a single sparse product with the jobs' rows of the index snapshot.
+    """
+    if not students:
+        return np.zeros((0, len(jobs)))
+    student_vectors = STUDENT_VECTORS.get_many(students, index)
+    if not jobs or index.matrix is None or len(student_vectors) < len(students):
+        content_scores = np.zeros((len(students), len(jobs)))
+        project_counts = np.array([len(s.projects) for s in students])
+    else:
+        student_matrix = sparse.vstack([student_vectors[s.id][0] for s in students], format='csr')
+        content_scores = (student_matrix @ index.job_matrix(jobs).T).toarray()
+        project_counts = np.array([student_vectors[s.id][1] for s in students])
+
+    cgpas = np.array([s.cgpa or 0.0 for s in students])[:, None]
+    required = np.array([job.cgpa_required for job in jobs])[None, :]
+    cgpa_bonus = np.where((cgpas != 0) & (cgpas >= required), 10, 0)
+    project_bonus = np.minimum(project_counts * 10, 20)[:, None]
+    return np.round(content_scores * 100 + cgpa_bonus + project_bonus, 2)
+
+
+def get_fit_score_for_application(student_id, job_id):
+    job = JobPosting.query.get(job_id)
+    if not job:
+        return 0
+
+    return get_fit_scores_for_job(job, [student_id]).get(student_id, 0)
+
+
+def get_fit_scores_for_student(student, jobs, top_k=None):
+    """Scores one student against many jobs, reusing a single student vector.
+
+    Returns [{'job': job, 'score': fit score}] best first. With top_k only the k
+    best jobs are kept, selected with a heap rather than a full sort.
+    """
+    if not jobs:
+        return []
+
+    index = JOB_INDEX.snapshot()
+    student_vector, num_projects = STUDENT_VECTORS.get(student, index)
+    content_scores = index.score_jobs(student_vector, jobs)
+    project_score = min(num_projects * 10, 20)
+
+    jobs_with_scores = []
+    for job, content_score_percentage in zip(jobs, content_scores):
+        total_score = content_score_percentage * 100 + project_score
+        if student.cgpa and student.cgpa >= job.cgpa_required:
+            total_score += 10
+        jobs_with_scores.append({'job': job, 'score': round(total_score, 2)})
+
+    if top_k is None:
+        return sorted(jobs_with_scores, key=lambda x: x['score'], reverse=True)
+    return heapq.nlargest(top_k, jobs_with_scores, key=lambda x: x['score'])
+
+
+# ==================== CANDIDATE MATCHING ====================
+
+FIT_SCORE_BATCH_SIZE = 1000  # students per pass; the dense batch x jobs score block stays small
+
+# One thread: score rewrites in this process never overlap each other, and a
+# long rebuild does not hold up certificate analysis on BACKGROUND_EXECUTOR.
+FIT_SCORE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='elevatr-fit')
+
+_queued_fit_refreshes = {}
+_fit_refresh_lock = threading.Lock()
+
+
+def queue_fit_refresh(key, fn, *args):
+    """Queues fn on FIT_SCORE_EXECUTOR unless the same refresh is already waiting to start; returns its future."""
+    with _fit_refresh_lock:
+        for queued_key in [k for k, f in _queued_fit_refreshes.items() if f.done()]:
+            del _queued_fit_refreshes[queued_key]
+        future = _queued_fit_refreshes.get(key)
+        if future is None or future.running():
+            # A refresh that has already started may have read the old state; queue another behind it.
+            future = run_on(FIT_SCORE_EXECUTOR, fn, *args)
+            _queued_fit_refreshes[key] = future
+        return future
+
+
+def queue_job_fit_refresh(job_id):
+    return queue_fit_refresh(('job', job_id), refresh_job_fit_scores, job_id)
+
+
+def queue_stale_fit_refresh():
+    return queue_fit_refresh('stale', refresh_stale_fit_scores)
+
+
+def write_fit_scores(replace):
+    """Runs replace() (delete + bulk insert) and commits, retrying once on a conflict.
+
+    Within a process every write runs on FIT_SCORE_EXECUTOR, one at a time.
+    Another worker process refreshing an overlapping slice can still commit
+    first and collide on the (student_id, job_id) key or deadlock; the retry
+    deletes their rows and writes ours.
+    """
+    for attempt in range(2):
+        try:
+            replace()
+            db.session.commit()
+            return
+        except (IntegrityError, OperationalError) as e:
+            db.session.rollback()
+            if attempt:
+                print(f"❌ Could not store fit scores: {e}")
+                return
+            print(f"⚠ Fit score write conflicted with another refresh; retrying")
+
+
+def refresh_fit_scores(job_ids, index):
+    """Rebuilds the given job columns of the student x job score matrix in one pass.
+
+    Students are read in batches of FIT_SCORE_BATCH_SIZE, vectorised once per
+    batch and scored against all the jobs together, so rebuilding every column
+    costs about as much as rebuilding one. Rows are tagged with index.generation.
+    """
+    jobs = JobPosting.query.filter(JobPosting.id.in_(job_ids)).order_by(JobPosting.id).all()
+    if not jobs:
+        return 0
+    job_ids = [job.id for job in jobs]
+
+    def replace():
+        FitScore.query.filter(FitScore.job_id.in_(job_ids)).delete(synchronize_session=False)
+        last_id = 0
+        while True:
+            students = Student.query.filter(Student.id > last_id).order_by(Student.id)\
+                .limit(FIT_SCORE_BATCH_SIZE).all()
+            if not students:
+                break
+            last_id = students[-1].id
+            scores = score_students_against_jobs(students, jobs, index)
+            for j, job in enumerate(jobs):
+                db.session.bulk_insert_mappings(FitScore, [
+                    {'student_id': student.id, 'job_id': job.id, 'score': float(score), 'generation': index.generation}
+                    for student, score in zip(students, scores[:, j])
+                ])
+
+    write_fit_scores(replace)
+    return len(jobs)
+
+
+def refresh_job_fit_scores(job_id):
+    """Builds one job's column, e.g. for a new posting. Runs on FIT_SCORE_EXECUTOR."""
+    refresh_fit_scores([job_id], JOB_INDEX.snapshot())
+
+
+def refresh_stale_fit_scores():
+    """Rebuilds every column computed against another vocabulary. Runs on FIT_SCORE_EXECUTOR.
+
+    Columns are picked when the sweep starts, so one that another worker has
+    already rebuilt for the same vocabulary is skipped.
+    """
+    index = JOB_INDEX.snapshot()
+    if index.generation is None:
+        return
+    job_ids = [job_id for (job_id,) in db.session.query(FitScore.job_id).filter(
+        db.or_(FitScore.generation.is_(None), FitScore.generation != index.generation)).distinct()]
+    if job_ids:
+        rebuilt = refresh_fit_scores(job_ids, index)
+        print(f"✅ Recomputed fit scores for {rebuilt} jobs")
+
+
+def refresh_student_fit_scores(student_id):
+    """Recomputes one student's row, for every job whose column has been built."""
+    student = Student.query.get(student_id)
+    if not student:
+        return
+
+    def replace():
+        index = JOB_INDEX.snapshot()
+        scored_jobs = JobPosting.query.filter(JobPosting.id.in_(db.session.query(FitScore.job_id).distinct())).all()
+        scores = score_students_against_jobs([student], scored_jobs, index)
+        FitScore.query.filter_by(student_id=student_id).delete()
+        db.session.bulk_insert_mappings(FitScore, [
+            {'student_id': student_id, 'job_id': job.id, 'score': float(score), 'generation': index.generation}
+            for job, score in zip(scored_jobs, scores[0])
+        ])
+
+    write_fit_scores(replace)
+
+
+def get_top_candidates(job, limit=20, college=None):
+    """Best-fit students for a job across the university, read from the score matrix.
+
+    Returns (candidates, ready). When the job's column has not been built yet a
+    refresh is queued and ([], False) comes back at once; the request itself
+    never scores the university.
+    """
+    if not FitScore.query.filter_by(job_id=job.id).first():
+        queue_job_fit_refresh(job.id)
+        return [], False
+
+    query = db.session.query(FitScore.score, Student)\
+        .join(Student, Student.id == FitScore.student_id)\
+        .filter(FitScore.job_id == job.id)
+    if college:
+        query = query.filter(Student.college == college)
+    return query.order_by(FitScore.score.desc()).limit(limit).all(), True
+
+
+def mark_fit_scores_stale(student_id):
+    """Queues a refresh of the student's FitScore row once the current transaction commits.
+
+    Call it for any change that feeds the fit score: skills, projects, CGPA,
+    or a brand new student.
+    """
+    db.session.info.setdefault('changed_students', set()).add(student_id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def refresh_changed_profiles(session):
+    changed_students = session.info.pop('changed_students', None)
+    for student_id in changed_students or ():
+        queue_fit_refresh(('student', student_id), refresh_student_fit_scores, student_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_changed_profiles(session):
+    session.info.pop('changed_students', None)
+
+
+# --- NEW HELPER FUNCTION ---
+def log_student_progress(student_id):
+    """Logs a snapshot of the student's current metrics."""
+    student = Student.query.get(student_id)
+    if not student:
+        return
+
+    try:
+        skills_list = json.loads(student.skills) if student.skills else []
+        skills_count = len(skills_list)
+    except (json.JSONDecodeError, TypeError):
+        skills_count = 0
+    
+    projects_count = StudentProject.query.filter_by(student_id=student_id).count()
+    certificates_count = Certificate.query.filter_by(student_id=student_id).count()
+    applications_count = JobApplication.query.filter_by(student_id=student_id).count()
+    
+    new_log = StudentProgress(
+        student_id=student_id,
+        cgpa=student.cgpa or 0.0,
+        skills_count=skills_count,
+        projects_count=projects_count,
+        certificates_count=certificates_count,
+        applications_count=applications_count
+    )
+    
+    db.session.add(new_log)
+    # Note: This function expects the caller to handle db.session.commit()
+# --- END NEW HELPER FUNCTION ---
+
+
+UNIVERSITY_STATS_TTL = int(os.getenv("UNIVERSITY_STATS_TTL", "60"))
+UNIVERSITY_STATS = LRUCache(1, ttl=UNIVERSITY_STATS_TTL)
+
+
+def offer_package_expression():
+    """Annual package of an offer in rupees: the midpoint of the posted range, or whichever end is set."""
+    low, high = JobPosting.salary_min, JobPosting.salary_max
+    return db.case(
+        ((low > 0) & (high > 0), (low + high) / 2),
+        (low > 0, low),
+        (high > 0, high),
+        else_=None,
+    )
+
+
+def university_placement_stats():
+    """Per-college placement figures for BPUT_COLLEGES, from a single GROUP BY query.
+
+    Students are outer-joined to their accepted applications and those
+    applications' postings, so one pass yields registered and placed counts,
+    distinct hiring companies and package totals for every college. The
+    university-wide distinct company count rides along as a scalar subquery.
+    Results are cached for UNIVERSITY_STATS_TTL seconds.
+    """
+    if UNIVERSITY_STATS_TTL > 0:
+        cached = UNIVERSITY_STATS.get('colleges')
+        if cached is not None:
+            return cached
+
+    package = offer_package_expression()
+    all_companies = db.session.query(db.func.count(db.distinct(JobPosting.company_id)))\
+        .join(JobApplication, JobApplication.job_id == JobPosting.id)\
+        .join(Student, Student.id == JobApplication.student_id)\
+        .filter(JobApplication.status == 'Accepted', Student.college.in_(BPUT_COLLEGES))\
+        .scalar_subquery()
+    rows = db.session.query(
+        Student.college,
+        db.func.count(db.distinct(Student.id)),
+        db.func.count(db.distinct(JobApplication.student_id)),
+        db.func.count(db.distinct(JobPosting.company_id)),
+        db.func.sum(package),
+        db.func.count(package),
+        all_companies,
+    ).outerjoin(JobApplication, (JobApplication.student_id == Student.id) & (JobApplication.status == 'Accepted'))\
+        .outerjoin(JobPosting, JobPosting.id == JobApplication.job_id)\
+        .filter(Student.college.in_(BPUT_COLLEGES))\
+        .group_by(Student.college).all()
+
+    by_college = {row[0]: row for row in rows}
+    colleges = []
+    package_total, offers = 0.0, 0
+    for college in BPUT_COLLEGES:
+        _, total, placed, companies, packages, offer_count, _ = by_college.get(college, (college, 0, 0, 0, None, 0, 0))
+        package_total += packages or 0.0
+        offers += offer_count
+        colleges.append({
+            'name': college,
+            'total_students': total,
+            'placed_students': placed,
+            'companies_participated': companies,
+            'avg_package': round(packages / offer_count / 100000, 1) if offer_count else None,  # LPA
+        })
+
+    stats = {
+        'colleges': colleges,
+        'companies': rows[0][6] if rows else 0,
+        'avg_package': round(package_total / offers / 100000, 1) if offers else None,
+    }
+    if UNIVERSITY_STATS_TTL > 0:
+        UNIVERSITY_STATS.set('colleges', stats)
+    return stats
+
+
+COLLEGE_DASHBOARD_PAGE_SIZE = int(os.getenv("COLLEGE_DASHBOARD_PAGE_SIZE", "50"))
+PLACEMENT_STATUSES = ['Accepted', 'Applied', 'Rejected', 'N/A']
+
+
+def student_application_summary(college_name):
+    """Subquery with one row per student of the college who has applied anywhere.
+
+    Carries the application count, whether any application was accepted or
+    rejected, and the company of the student's first accepted application
+    (lowest id), joined through that application's posting.
+    """
+    accepted = JobApplication.status == 'Accepted'
+    per_student = db.session.query(
+        JobApplication.student_id.label('student_id'),
+        db.func.count(JobApplication.id).label('application_count'),
+        db.func.max(db.case((accepted, 1), else_=0)).label('accepted'),
+        db.func.max(db.case((JobApplication.status == 'Rejected', 1), else_=0)).label('rejected'),
+        db.func.min(db.case((accepted, JobApplication.id), else_=None)).label('accepted_application_id'),
+    ).filter(JobApplication.student_id.in_(db.select(Student.id).where(Student.college == college_name)))\
+        .group_by(JobApplication.student_id).subquery()
+
+    accepted_application = aliased(JobApplication)
+    return db.session.query(per_student, Company.company_name.label('placed_company'))\
+        .outerjoin(accepted_application, accepted_application.id == per_student.c.accepted_application_id)\
+        .outerjoin(JobPosting, JobPosting.id == accepted_application.job_id)\
+        .outerjoin(Company, Company.id == JobPosting.company_id)\
+        .subquery()
+
+
+def college_student_overview(college_name, status=None, sort='name', descending=False, page=1,
+                             per_page=COLLEGE_DASHBOARD_PAGE_SIZE):
+    """One page of a college's students with their placement status, in two queries.
+
+    Status is 'Accepted' if any application was accepted, otherwise 'Rejected'
+    if any was rejected, 'Applied' if there are applications at all and 'N/A'
+    if not. The first query counts students per status for the whole college
+    (the stat cards and filter totals); the second fetches the requested page.
+    """
+    summary = student_application_summary(college_name)
+    application_count = db.func.coalesce(summary.c.application_count, 0)
+    placement_status = db.case(
+        (summary.c.accepted == 1, 'Accepted'),
+        (summary.c.rejected == 1, 'Rejected'),
+        (summary.c.application_count > 0, 'Applied'),
+        else_='N/A',
+    )
+
+    def college_students(*columns):
+        return db.session.query(*columns).select_from(Student)\
+            .outerjoin(summary, summary.c.student_id == Student.id)\
+            .filter(Student.college == college_name)
+
+    status_counts = dict(college_students(placement_status, db.func.count(Student.id))
+                         .group_by(placement_status).all())
+    matching = status_counts.get(status, 0) if status else sum(status_counts.values())
+    pages = max(1, -(-matching // per_page))
+    page = min(max(page, 1), pages)
+
+    sort_columns = {
+        'name': Student.full_name,
+        'registration': Student.registration_number,
+        'cgpa': Student.cgpa,
+        'applications': application_count,
+        'status': placement_status,
+    }
+    order = sort_columns.get(sort, Student.full_name)
+    query = college_students(Student, application_count, placement_status, summary.c.placed_company)
+    if status:
+        query = query.filter(placement_status == status)
+    rows = query.order_by(order.desc() if descending else order.asc(), Student.id)\
+        .limit(per_page).offset((page - 1) * per_page).all()
+
+    return {
+        'students': [
+            {'info': student, 'application_count': count, 'placement_status': row_status,
+             'placed_company': company}
+            for student, count, row_status, company in rows
+        ],
+        'status_counts': {name: status_counts.get(name, 0) for name in PLACEMENT_STATUSES},
+        'total': sum(status_counts.values()),
+        'matching': matching,
+        'page': page,
+        'pages': pages,
+    }
+
+
+PLACEMENT_DETAILS_PAGE_SIZE = int(os.getenv("PLACEMENT_DETAILS_PAGE_SIZE", "50"))
+
+
+def college_placement_page(college_name, after=None, before=None, per_page=PLACEMENT_DETAILS_PAGE_SIZE):
+    """A page of a college's students and their accepted offers, ordered by (full_name, id).
+
+    One statement: students LEFT JOIN the per-student application summary,
+    which only aggregates this college's applications.
+    Paging is keyset-based: `after` or `before` is the (full_name, id) of the
+    last or first row of the neighbouring page, so deep pages cost the same as
+    the first. Returns the rows plus cursors for the previous and next pages.
+    """
+    summary = student_application_summary(college_name)
+    query = db.session.query(Student, summary.c.accepted, summary.c.placed_company)\
+        .outerjoin(summary, summary.c.student_id == Student.id)\
+        .filter(Student.college == college_name)
+
+    if before is not None:
+        name, student_id = before
+        query = query.filter(db.or_(Student.full_name < name,
+                                    db.and_(Student.full_name == name, Student.id < student_id)))\
+            .order_by(Student.full_name.desc(), Student.id.desc())
+    else:
+        if after is not None:
+            name, student_id = after
+            query = query.filter(db.or_(Student.full_name > name,
+                                        db.and_(Student.full_name == name, Student.id > student_id)))
+        query = query.order_by(Student.full_name, Student.id)
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before is not None:
+        rows.reverse()
+        has_previous, has_next = has_more, True
+    else:
+        has_previous, has_next = after is not None, has_more
+
+    students = [
+        {'info': student, 'is_placed': accepted == 1, 'company_name': company}
+        for student, accepted, company in rows
+    ]
+    return {
+        'students': students,
+        'previous': (rows[0][0].full_name, rows[0][0].id) if rows and has_previous else None,
+        'next': (rows[-1][0].full_name, rows[-1][0].id) if rows and has_next else None,
+    }
+
+
+def calculate_profile_completion(student):
+    """Calculates the student's profile completion percentage."""
+   
+    total_points = 8
+    completed_points = 0
+
+    if student.profile_photo:
+        completed_points += 1
+    if student.mobile:
+        completed_points += 1
+    if student.cgpa and student.cgpa > 0:
+        completed_points += 1
+    if student.summary:
+        completed_points += 1
+    if student.linkedin_url:
+        completed_points += 1
+    
+    
+    try:
+        skills_list = json.loads(student.skills) if student.skills else []
+        if skills_list:
+            completed_points += 1
+    except:
+        pass
+    
+    
+    if student.projects: 
+        completed_points += 1
+    if student.certificates: 
+        completed_points += 1
+    
+    if total_points == 0:
+        return 100
+    
+    percentage = (completed_points / total_points) * 100
+    return int(percentage)
+
+# ==================== RESUME PDFS ====================
+
+RESUME_CACHE_DIR = os.getenv("RESUME_CACHE_DIR") or os.path.join(app.instance_path, 'resume_cache')
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_MB", "256")) * 1024 * 1024
+RESUME_TEMPLATE = 'resume_template.html'
+
+
+def resume_contexts(students):
+    """Everything resume_template.html renders, for each student in order.
+
+    Projects and certificates for the whole batch come from two queries.
+    """
+    student_ids = [student.id for student in students]
+    projects, certificates = defaultdict(list), defaultdict(list)
+    if student_ids:
+        for project in StudentProject.query.filter(StudentProject.student_id.in_(student_ids))\
+                .order_by(StudentProject.created_at.desc()):
+            projects[project.student_id].append(project)
+        for certificate in Certificate.query.filter(Certificate.student_id.in_(student_ids))\
+                .order_by(Certificate.uploaded_at.desc()):
+            certificates[certificate.student_id].append(certificate)
+
+    contexts = []
+    for student in students:
+        try:
+            skills_list = json.loads(student.skills) if student.skills else []
+        except (json.JSONDecodeError, TypeError):
+            skills_list = []
+        contexts.append({'student': student, 'projects': projects[student.id],
+                         'certificates': certificates[student.id], 'skills_list': skills_list})
+    return contexts
+
+
+def resume_context(student):
+    return resume_contexts([student])[0]
+
+
+def resume_fingerprint(context):
+    """Hash of every value the resume template prints, plus the template itself.
+
+    Used as both the cache key and the ETag, so a PDF is only re-rendered when
+    something visible on it changes.
+    """
+    student = context['student']
+    template_path = os.path.join(app.root_path, app.template_folder, RESUME_TEMPLATE)
+    try:
+        template_stamp = os.stat(template_path).st_mtime_ns
+    except OSError:
+        template_stamp = None
+    payload = json.dumps([
+        template_stamp,
+        [student.full_name, student.email, student.mobile, student.address, student.linkedin_url,
+         student.portfolio_url, student.summary, student.college, student.registration_number, student.cgpa],
+        context['skills_list'],
+        [[p.project_title, p.description, p.github_link, p.site_link, p.youtube_link] for p in context['projects']],
+        [[c.title, c.uploaded_at.strftime('%Y-%m-%d') if c.uploaded_at else None] for c in context['certificates']],
+    ], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def render_resume_html(context):
+    return render_template(RESUME_TEMPLATE, **context)
+
+
+def html_to_pdf(html):
+    """Runs xhtml2pdf over rendered resume HTML; returns the PDF bytes or None on failure.
+
+    Takes and returns plain values so it can run in a worker process.
+    """
+    from xhtml2pdf import pisa
+
+    pdf_bytes = BytesIO()
+    pisa_status = pisa.CreatePDF(BytesIO(html.encode('UTF-8')), dest=pdf_bytes)
+    if pisa_status.err:
+        return None
+    return pdf_bytes.getvalue()
+
+
+def resume_download_name(student):
+    return f'{student.full_name.replace(" ", "_")}_Resume.pdf'
+
+
+def resume_response(source, student, fingerprint):
+    """Sends a resume PDF tagged with its fingerprint; browsers revalidate before reuse."""
+    response = send_file(source, mimetype='application/pdf', as_attachment=True,
+                         download_name=resume_download_name(student), etag=fingerprint, conditional=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def resume_not_modified(fingerprint):
+    response = app.response_class(status=304)
+    response.set_etag(fingerprint)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+class ResumePDFCache:
+    """Rendered resume PDFs on disk, one current file per student, bounded in total size.
+
+    Files are named <student_id>-<fingerprint>.pdf. Storing a new version removes
+    the student's older ones; when the directory grows past max_bytes the least
+    recently served files go first (reads bump the file's mtime). Writes go
+    through a temporary file and os.replace, so several workers can share the
+    directory without serving a half-written PDF.
+
+    The directory is scanned once per process to build an index of files and
+    their total size, which stores then keep up to date, so a store costs a
+    constant number of filesystem calls. Only eviction rescans (picking up
+    what other workers wrote) and it trims to 90% of max_bytes, so scans are
+    spread over many stores.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.files = None  # student_id -> {name: size}, built on first store
+        self.total = 0
+
+    def path(self, student_id, fingerprint):
+        return os.path.join(self.directory, f'{student_id}-{fingerprint}.pdf')
+
+    def get(self, student_id, fingerprint):
+        """Returns the cached PDF's path, or None."""
+        path = self.path(student_id, fingerprint)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def set(self, student_id, fingerprint, pdf, evict=True):
+        """Stores a PDF and returns its path, or None if the directory isn't writable.
+
+        Pass evict=False when storing many PDFs in a row and call evict() once
+        at the end.
+        """
+        path = self.path(student_id, fingerprint)
+        staging = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(staging, 'wb') as f:
+                f.write(pdf)
+            os.replace(staging, path)
+        except OSError as e:
+            print(f"⚠ Could not cache resume PDF for student {student_id}: {e}")
+            try:
+                os.remove(staging)
+            except OSError:
+                pass
+            return None
+
+        name = os.path.basename(path)
+        with self.lock:
+            if self.files is None:
+                self._scan()
+            versions = self.files.setdefault(student_id, {})
+            for old_name in [n for n in versions if n != name]:
+                self._remove(old_name)
+                self.total -= versions.pop(old_name)
+            self.total += len(pdf) - versions.get(name, 0)
+            versions[name] = len(pdf)
+            over_budget = self.total > self.max_bytes
+        if evict and over_budget:
+            self.evict()
+        return path
+
+    def _scan(self):
+        """Rebuilds the index from the directory; returns [(mtime, size, name)]. Caller holds the lock."""
+        entries = []
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith('.pdf')]
+        except OSError:
+            names = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        self.files = {}
+        for _, size, name in entries:
+            self.files.setdefault(self._owner(name), {})[name] = size
+        self.total = sum(size for _, size, _ in entries)
+        return entries
+
+    @staticmethod
+    def _owner(name):
+        student_id = name.split('-', 1)[0]
+        return int(student_id) if student_id.isdigit() else student_id
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass  # another worker got there first
+
+    def evict(self):
+        """If over max_bytes, deletes the least recently served PDFs down to the low-water mark."""
+        with self.lock:
+            if self.files is not None and self.total <= self.max_bytes:
+                return
+            entries = self._scan()
+            if self.total <= self.max_bytes:
+                return
+            target = self.max_bytes * self.LOW_WATER
+            for _, size, name in sorted(entries):
+                if self.total <= target:
+                    break
+                self._remove(name)
+                self.files.get(self._owner(name), {}).pop(name, None)
+                self.total -= size
+
+
+RESUME_PDFS = ResumePDFCache(RESUME_CACHE_DIR, RESUME_CACHE_MAX_BYTES)
+
+
+RESUME_EXPORT_WORKERS = int(os.getenv("RESUME_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+RESUME_EXPORT_BATCH = 100
+
+_resume_export_pool = None
+_resume_export_pool_lock = threading.Lock()
+
+
+def resume_export_pool():
+    """Process pool for xhtml2pdf, created on first use.
+
+    Workers are spawned rather than forked so they don't inherit the server's
+    threads and locks; each one imports this module once.
+    """
+    global _resume_export_pool
+    with _resume_export_pool_lock:
+        if _resume_export_pool is None:
+            _resume_export_pool = ProcessPoolExecutor(max_workers=RESUME_EXPORT_WORKERS,
+                                                      mp_context=multiprocessing.get_context('spawn'))
+        return _resume_export_pool
+
+
+def reset_resume_export_pool():
+    global _resume_export_pool
+    with _resume_export_pool_lock:
+        if _resume_export_pool is not None:
+            _resume_export_pool.shutdown(wait=False, cancel_futures=True)
+        _resume_export_pool = None
 
-def get_fit_score_for_application(student_id, job_id):
-    student = Student.query.get(student_id)
-    job = JobPosting.query.get(job_id)
 
-    if not student or not job:
-        return 0
+def college_resume_contexts(college_name):
+    """Resume contexts for every student of a college, RESUME_EXPORT_BATCH students at a time.
 
-    student_skills = ' '.join(json.loads(student.skills) if student.skills else [])
-    student_projects_text = ' '.join([p.description for p in student.projects if p.description])
-    student_doc = f"{student_skills} {student_projects_text}"
+    Each batch is expunged before the next is loaded, so the session never holds
+    more than one batch of rows.
+    """
+    last_id = 0
+    while True:
+        students = Student.query.filter(Student.college == college_name, Student.id > last_id)\
+            .order_by(Student.id).limit(RESUME_EXPORT_BATCH).all()
+        if not students:
+            return
+        yield from resume_contexts(students)
+        last_id = students[-1].id
+        db.session.expunge_all()
 
-    job_skills = ' '.join(json.loads(job.required_skills) if job.required_skills else [])
-    job_doc = f"{job.job_role} {job.description} {job_skills}"
 
-    content_score_percentage = 0
-    try:
-        tfidf_vectorizer = TfidfVectorizer(stop_words='english')
-        corpus = [student_doc, job_doc] 
-        tfidf_matrix = tfidf_vectorizer.fit_transform(corpus)
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-        content_score_percentage = cosine_sim[0][0]
-    except ValueError:
-        content_score_percentage = 0
-
-    total_score = 0
-    total_score += content_score_percentage * 100
-    
-    if student.cgpa and student.cgpa >= job.cgpa_required:
-        total_score += 10
-    
-    num_projects = len(student.projects)
-    total_score += min(num_projects * 10, 20)
+class ZipStream:
+    """Write-only file object that hands back whatever zipfile has written since the last drain."""
 
-    return round(total_score, 2)
+    def __init__(self):
+        self.chunks = []
 
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
 
-# --- NEW HELPER FUNCTION ---
-def log_student_progress(student_id):
-    """Logs a snapshot of the student's current metrics."""
-    student = Student.query.get(student_id)
-    if not student:
-        return
+    def flush(self):
+        pass
 
-    try:
-        skills_list = json.loads(student.skills) if student.skills else []
-        skills_count = len(skills_list)
-    except (json.JSONDecodeError, TypeError):
-        skills_count = 0
-    
-    projects_count = StudentProject.query.filter_by(student_id=student_id).count()
-    certificates_count = Certificate.query.filter_by(student_id=student_id).count()
-    applications_count = JobApplication.query.filter_by(student_id=student_id).count()
-    
-    new_log = StudentProgress(
-        student_id=student_id,
-        cgpa=student.cgpa or 0.0,
-        skills_count=skills_count,
-        projects_count=projects_count,
-        certificates_count=certificates_count,
-        applications_count=applications_count
-    )
-    
-    db.session.add(new_log)
-    # Note: This function expects the caller to handle db.session.commit()
-# --- END NEW HELPER FUNCTION ---
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
 
 
-def calculate_placement_stats(students):
-    total_students = len(students)
-    if total_students == 0:
-        return {'total': 0, 'placed': 0, 'rate': 0.0}
+def resume_archive_name(student):
+    return secure_filename(f'{student.registration_number}_{student.full_name}.pdf') or f'{student.id}.pdf'
 
-    placed_student_ids = db.session.query(JobApplication.student_id)\
-        .filter(JobApplication.student_id.in_([s.id for s in students]))\
-        .filter(JobApplication.status == 'Accepted')\
-        .distinct().count()
 
-    rate = (placed_student_ids / total_students) * 100
-    return {'total': total_students, 'placed': placed_student_ids, 'rate': round(rate, 1)}
+def stream_college_resumes(college_name):
+    """Yields a ZIP of every student's resume, adding each PDF as soon as it is ready.
 
-def calculate_profile_completion(student):
-    """Calculates the student's profile completion percentage."""
-   
-    total_points = 8
-    completed_points = 0
+    Cached PDFs are copied straight in; the rest are rendered to HTML here and
+    converted on the process pool, with at most two conversions per worker in
+    flight, so memory stays flat however large the college is.
+    """
+    stream = ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)  # PDFs are already compressed
+    pending = {}
+    failed = []
+    max_pending = RESUME_EXPORT_WORKERS * 2
+
+    def add(name, pdf):
+        archive.writestr(zipfile.ZipInfo(name, date_time=time.localtime()[:6]), pdf)
+
+    def collect(futures):
+        for future in futures:
+            name, student_id, fingerprint = pending.pop(future)
+            try:
+                pdf = future.result()
+            except BrokenProcessPool as e:
+                print(f"❌ Resume export pool died: {e}")
+                reset_resume_export_pool()
+                pdf = None
+            except Exception as e:
+                print(f"❌ Resume export failed for student {student_id}: {e}")
+                pdf = None
+            if pdf is None:
+                failed.append(name)
+                continue
+            add(name, pdf)
+            RESUME_PDFS.set(student_id, fingerprint, pdf, evict=False)
 
-    if student.profile_photo:
-        completed_points += 1
-    if student.mobile:
-        completed_points += 1
-    if student.cgpa and student.cgpa > 0:
-        completed_points += 1
-    if student.summary:
-        completed_points += 1
-    if student.linkedin_url:
-        completed_points += 1
-    
-    
     try:
-        skills_list = json.loads(student.skills) if student.skills else []
-        if skills_list:
-            completed_points += 1
-    except:
-        pass
-    
-    
-    if student.projects: 
-        completed_points += 1
-    if student.certificates: 
-        completed_points += 1
-    
-    if total_points == 0:
-        return 100
-    
-    percentage = (completed_points / total_points) * 100
-    return int(percentage)
+        pool = resume_export_pool()
+        for context in college_resume_contexts(college_name):
+            student = context['student']
+            name = resume_archive_name(student)
+            fingerprint = resume_fingerprint(context)
+            path = RESUME_PDFS.get(student.id, fingerprint)
+            if path is not None:
+                try:
+                    with open(path, 'rb') as f:
+                        add(name, f.read())
+                    yield stream.drain()
+                    continue
+                except OSError:
+                    pass  # evicted since the lookup; render it instead
+
+            while len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+                yield stream.drain()
+            try:
+                future = pool.submit(html_to_pdf, render_resume_html(context))
+            except BrokenProcessPool:
+                reset_resume_export_pool()
+                pool = resume_export_pool()
+                future = pool.submit(html_to_pdf, render_resume_html(context))
+            pending[future] = (name, student.id, fingerprint)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+            yield stream.drain()
+
+        RESUME_PDFS.evict()  # once for the whole export rather than per PDF
+        if failed:
+            add('errors.txt', 'Could not generate resumes for:\n' + '\n'.join(failed) + '\n')
+        archive.close()
+        yield stream.drain()
+    finally:
+        for future in pending:
+            future.cancel()
+
 
 # ==================== ROUTES ====================
 
@@ -471,24 +3028,37 @@ def chatbot_page():
     return render_template('chatbot.html')
 
 
+def build_chatbot_prompt(user_message):
+    return f"""You are ElevatR Assistant, a helpful placement chatbot for BPUT students. 
+Be friendly, helpful, and concise.
+
+User: {user_message}
+Assistant:"""
+
+
+def sse_event(data, event=None):
+    """Formats one Server-Sent Events frame with a JSON payload."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
 @app.route('/chatbot_api', methods=['POST'])
 def chatbot_api():
     user_message = request.json.get("message")
     if not user_message:
         return jsonify({"reply": "Please type a message!"})
 
-    if not GEMINI_MODEL:
+    cached_reply = CHATBOT_ANSWERS.get(user_message)
+    if cached_reply is not None:
+        return jsonify({"reply": cached_reply})
+
+    if not AI.available():
         return jsonify({"reply": "Sorry, the chatbot is currently unavailable. Please try again later."})
 
     try:
-        prompt = f"""You are ElevatR Assistant, a helpful placement chatbot for BPUT students. 
-Be friendly, helpful, and concise.
-
-User: {user_message}
-Assistant:"""
-        
-        response = GEMINI_MODEL.generate_content(prompt)
+        response = AI.generate(build_chatbot_prompt(user_message))
         bot_reply = response.text.strip()
+        CHATBOT_ANSWERS.set(user_message, bot_reply)
         
         return jsonify({"reply": bot_reply})
         
@@ -497,6 +3067,67 @@ Assistant:"""
         return jsonify({"reply": "Sorry, I'm having trouble connecting. Please try again later."})
 
 
+@app.route('/chatbot_stream', methods=['GET', 'POST'])
+def chatbot_stream():
+    """Relays Gemini's streamed reply as Server-Sent Events.
+
+    Accepts {"message": ...} as a JSON POST, or ?message= for EventSource.
+    Emits one {"delta": text} frame per chunk, then a "done" event; failures
+    arrive as an "error" event carrying the same reply /chatbot_api would give.
+    """
+    if request.method == 'POST':
+        user_message = (request.get_json(silent=True) or {}).get("message")
+    else:
+        user_message = request.args.get("message")
+
+    def generate():
+        if not user_message:
+            yield sse_event({"reply": "Please type a message!"}, event="error")
+            return
+        cached_reply = CHATBOT_ANSWERS.get(user_message)
+        if cached_reply is not None:
+            yield sse_event({"delta": cached_reply})
+            yield sse_event({"cached": True}, event="done")
+            return
+        if not AI.available():
+            yield sse_event({"reply": "Sorry, the chatbot is currently unavailable. Please try again later."}, event="error")
+            return
+
+        parts = []
+        try:
+            for chunk in AI.stream(build_chatbot_prompt(user_message)):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata only)
+                    continue
+                if text:
+                    parts.append(text)
+                    yield sse_event({"delta": text})
+        except Exception as e:
+            print(f"Gemini API Error: {e}")
+            yield sse_event({"reply": "Sorry, I'm having trouble connecting. Please try again later."}, event="error")
+            return
+        CHATBOT_ANSWERS.set(user_message, ''.join(parts).strip())
+        yield sse_event({}, event="done")
+
+    return app.response_class(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # keep nginx from buffering the stream
+    })
+
+
+@app.route('/api/ai_status')
+def api_ai_status():
+    if not session.get('logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+    status = GEMINI.status()
+    status['gateway'] = AI.status()
+    status['chatbot_cache'] = CHATBOT_ANSWERS.stats()
+    status['improvement_plan_cache'] = IMPROVEMENT_PLANS.stats()
+    return jsonify(status)
+
+
 @app.route('/resources')
 def resources():
     return render_template('resources.html')
@@ -533,6 +3164,8 @@ def student_register():
         )
         
         db.session.add(new_student)
+        db.session.flush()
+        mark_fit_scores_stale(new_student.id)  # so they can show up as a top candidate
         db.session.commit()
         
         session['logged_in'] = True
@@ -581,7 +3214,7 @@ def student_profile():
     except (json.JSONDecodeError, TypeError):
         student_skills = []
 
-    recommendations = get_recommendations(student.id)
+    recommendations = get_cached_recommendations(student)
     certificates = Certificate.query.filter_by(student_id=student.id).order_by(Certificate.uploaded_at.desc()).all()
     
     completion_percentage = calculate_profile_completion(student)
@@ -600,7 +3233,11 @@ def student_edit_profile():
         flash('Please log in to view this page.', 'error')
         return redirect(url_for('student_login'))
     
-    student = Student.query.get(session['user_id'])
+    if request.method == 'POST':
+        # Locked so a certificate job can't merge skills between our read and our write
+        student = lock_student(session['user_id'])
+    else:
+        student = Student.query.get(session['user_id'])
     
     # --- FIX 1: Handles the 'NoneType' object has no attribute 'id' error ---
     if not student:
@@ -614,6 +3251,7 @@ def student_edit_profile():
         student.mobile = request.form['mobile']
         
         # --- FIX 2: Handles the '400 Bad Request' (ValueError) for CGPA ---
+        previous_cgpa = student.cgpa
         try:
             cgpa_input = request.form.get('cgpa')
             if cgpa_input:
@@ -632,8 +3270,20 @@ def student_edit_profile():
                                    portfolio_url=request.form.get('portfolio_url', ''),
                                    address=request.form.get('address', ''))
         
+        if student.cgpa != previous_cgpa:
+            mark_fit_scores_stale(student.id)  # the CGPA bonus is part of every fit score
+
         skills_input = request.form.get('skills', '')
         skills_list = [s.strip() for s in skills_input.split(',') if s.strip()]
+        # Keep skills that were added (e.g. by a certificate) after this form was loaded
+        if 'skills_loaded' in request.form:
+            loaded = {s.strip().lower() for s in request.form['skills_loaded'].split(',')}
+            submitted = {s.lower() for s in skills_list}
+            skills_list += [s for s in parse_skills(student.skills)
+                            if s.strip().lower() not in loaded and s.strip().lower() not in submitted]
+        if parse_skills(student.skills) != skills_list:
+            STUDENT_VECTORS.invalidate(student.id)
+            sync_student_skills(student.id, skills_list)
         student.skills = json.dumps(skills_list)
         student.summary = request.form.get('summary', '')
         student.linkedin_url = request.form.get('linkedin_url', '')
@@ -676,39 +3326,22 @@ def download_resume():
         flash('Student profile not found.', 'error')
         return redirect(url_for('student_profile'))
 
-    projects = StudentProject.query.filter_by(student_id=student.id).order_by(StudentProject.created_at.desc()).all()
-    certificates = Certificate.query.filter_by(student_id=student.id).order_by(Certificate.uploaded_at.desc()).all()
-    try:
-        skills_list = json.loads(student.skills) if student.skills else []
-    except (json.JSONDecodeError, TypeError):
-        skills_list = []
-
-    rendered_html = render_template(
-        'resume_template.html',
-        student=student,
-        projects=projects,
-        certificates=certificates,
-        skills_list=skills_list,
-    )
-
-    pdf_bytes = BytesIO()
-    pisa_status = pisa.CreatePDF(
-        BytesIO(rendered_html.encode('UTF-8')),
-        dest=pdf_bytes
-    )
-
-    if pisa_status.err:
-        flash('Error generating PDF.', 'error')
-        return redirect(url_for('student_profile'))
+    context = resume_context(student)
+    fingerprint = resume_fingerprint(context)
+    if fingerprint in request.if_none_match:
+        return resume_not_modified(fingerprint)
 
-    pdf_bytes.seek(0)
+    path = RESUME_PDFS.get(student.id, fingerprint)
+    if path is None:
+        pdf = html_to_pdf(render_resume_html(context))
+        if pdf is None:
+            flash('Error generating PDF.', 'error')
+            return redirect(url_for('student_profile'))
+        path = RESUME_PDFS.set(student.id, fingerprint, pdf)
+        if path is None:
+            return resume_response(BytesIO(pdf), student, fingerprint)
 
-    return send_file(
-        pdf_bytes,
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=f'{student.full_name.replace(" ", "_")}_Resume.pdf'
-    )
+    return resume_response(path, student, fingerprint)
 
 
 @app.route('/add_project', methods=['POST'])
@@ -726,6 +3359,7 @@ def add_project():
             youtube_link=request.form.get('youtube_link')
         )
         db.session.add(project)
+        STUDENT_VECTORS.invalidate(session['user_id'])
         db.session.commit()
         flash('Project added successfully!', 'success')
 
@@ -750,87 +3384,115 @@ def add_certificate():
         flash('Invalid file type for certificate.', 'error')
         return redirect(url_for('student_edit_profile'))
 
+    from PIL import Image
+
     try:
-        img = Image.open(file)
+        with Image.open(file) as img:
+            img.verify()
     except Exception as e:
         flash(f'Error processing image: {e}', 'error')
         return redirect(url_for('student_edit_profile'))
 
-    prompt = """
-    Analyze this certificate image.
-    Extract all relevant technical skills and also non-technical skills even smaller smaller skills need to be extract  , programming languages, software, or tools mentioned.
-    Do not extract soft skills.. ,and if the cirtificate look like resume then also extract skills from them also , 
-    Return the skills as a single, flat JSON list of strings.
-    even "outstanding gerdener" is a skill. remember this text .
-    
-    Example: ["Python", "Machine Learning", "TensorFlow", "Pandas", "Java"]
-    
-    If no  skills are found, return an empty list: []
-    """
-
-    newly_found_skills = []
-    
-    if not GEMINI_MODEL:
-        flash('AI analysis model is not available.', 'error')
-    else:
-        try:
-            response = GEMINI_MODEL.generate_content([prompt, img])
-            
-            clean_response = re.sub(r'```json\s*|\s*```', '', response.text.strip())
-            
-            newly_found_skills = json.loads(clean_response)
-            
-            if not isinstance(newly_found_skills, list):
-                newly_found_skills = []
-                
-        except json.JSONDecodeError:
-            print("Gemini response was not valid JSON.")
-            flash('AI analyzed the certificate but could not extract skills in a valid format.', 'warning')
-        except Exception as e:
-            print(f"Gemini API Error: {e}")
-            flash('Error during AI analysis of the certificate.', 'error')
-
-    file.seek(0)
-    filename = secure_filename(f"cert_{student_id}_{file.filename}")
-    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+    filename, content_hash = save_certificate_file(file, student_id)
 
     new_certificate = Certificate(
         student_id=student_id,
         title=title,
-        filename=filename
+        filename=filename,
+        analysis_status='pending',
+        content_hash=content_hash
     )
     db.session.add(new_certificate)
+    db.session.commit()
 
-    student = Student.query.get(student_id)
-    if student:
+    run_in_background(process_certificate, new_certificate.id, url_for('student_edit_profile'))
+    flash('Certificate added! Skills are being extracted in the background; you will be notified when they are added.', 'success')
+    return redirect(url_for('student_edit_profile'))
+
+
+def certificate_title_from_filename(filename):
+    return os.path.splitext(filename)[0].replace('_', ' ').replace('-', ' ').strip().title()[:200] or 'Certificate'
+
+
+@app.route('/add_certificates_bulk', methods=['POST'])
+def add_certificates_bulk():
+    if session.get('role') != 'student':
+        flash('Unauthorized access.', 'error')
+        return redirect(url_for('landing'))
+
+    student_id = session['user_id']
+    files = [file for file in request.files.getlist('certificate_images') if file and file.filename]
+    titles = request.form.getlist('titles')
+
+    if not files:
+        flash('Please choose at least one certificate image.', 'error')
+        return redirect(url_for('student_edit_profile'))
+    if len(files) > CERTIFICATE_BULK_LIMIT:
+        flash(f'You can upload at most {CERTIFICATE_BULK_LIMIT} certificates at once.', 'error')
+        return redirect(url_for('student_edit_profile'))
+
+    from PIL import Image
+
+    certificates, skipped = [], []
+    for i, file in enumerate(files):
+        if not allowed_file(file.filename):
+            skipped.append(file.filename)
+            continue
         try:
-            current_skills_list = json.loads(student.skills) if student.skills else []
-        except (json.JSONDecodeError, TypeError):
-            current_skills_list = []
-        
-        current_skills_set = {s.lower().strip() for s in current_skills_list}
-        new_skills_set = {s.lower().strip() for s in newly_found_skills}
-        
-        updated_skills_set = current_skills_set.union(new_skills_set)
-        
-        final_skills_list = sorted([s.title() for s in updated_skills_set])
-        
-        student.skills = json.dumps(final_skills_list)
-        db.session.commit()
-        
-        new_skill_count = len(new_skills_set - current_skills_set)
-        if new_skill_count > 0:
-            flash(f'Certificate added and {new_skill_count} new skills were found and added to your profile!', 'success')
-        else:
-            flash('Certificate added successfully! No new skills were detected.', 'success')
-            
-    else:
-        db.session.commit()
-        flash('Certificate added, but could not find student profile to update skills.', 'error')
+            with Image.open(file) as img:
+                img.verify()
+        except Exception:
+            skipped.append(file.filename)
+            continue
+
+        filename, content_hash = save_certificate_file(file, student_id)
+
+        title = titles[i].strip() if i < len(titles) and titles[i].strip() else certificate_title_from_filename(file.filename)
+        certificates.append(Certificate(
+            student_id=student_id,
+            title=title,
+            filename=filename,
+            analysis_status='pending',
+            content_hash=content_hash
+        ))
+
+    if not certificates:
+        flash('None of the uploaded files were valid images.', 'error')
+        return redirect(url_for('student_edit_profile'))
+
+    db.session.add_all(certificates)
+    db.session.commit()
 
+    run_in_background(process_certificate_batch, [c.id for c in certificates], url_for('student_edit_profile'))
+    flash(f'{len(certificates)} certificates added! Skills are being extracted in the background; '
+          f'you will be notified when they are added.', 'success')
+    if skipped:
+        flash(f"Skipped {len(skipped)} file(s) that were not valid images: {', '.join(skipped)}", 'warning')
     return redirect(url_for('student_edit_profile'))
 
 
+@app.route('/api/certificate_status')
+def certificate_status():
+    """Analysis status of the current student's certificates, for the edit page to poll."""
+    if session.get('role') != 'student':
+        return jsonify({"error": "Unauthorized"}), 401
+
+    query = Certificate.query.filter_by(student_id=session['user_id'])
+    ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip().isdigit()]
+    if ids:
+        query = query.filter(Certificate.id.in_(ids))
+    else:
+        query = query.filter(Certificate.analysis_status.in_(['pending', 'processing']))
+
+    return jsonify({"certificates": [{
+        "id": certificate.id,
+        "title": certificate.title,
+        "status": certificate.analysis_status,
+        "skills_found": json.loads(certificate.skills_found) if certificate.skills_found else [],
+        "error": certificate.analysis_error,
+    } for certificate in query.all()]})
+
+
 @app.route('/delete_project/<int:project_id>')
 def delete_project(project_id):
     if session.get('role') != 'student':
@@ -842,6 +3504,7 @@ def delete_project(project_id):
         return redirect(url_for('student_profile'))
     
     db.session.delete(project)
+    STUDENT_VECTORS.invalidate(project.student_id)
     db.session.commit()
     flash('Project deleted!', 'success')
     return redirect(url_for('student_edit_profile'))
@@ -927,9 +3590,6 @@ def generate_improvement_plan():
     if session.get('role') != 'student':
         return jsonify({"error": "Unauthorized"}), 401
     
-    if not GEMINI_MODEL:
-        return jsonify({"error": "AI model not available"}), 503
-    
     try:
         data = request.get_json()
         job_role = data.get('jobRole', '')
@@ -941,14 +3601,24 @@ def generate_improvement_plan():
         student_skills_lower = {skill.lower() for skill in student_skills}
         missing_skills = [skill for skill in job_skills 
                          if skill.lower() not in student_skills_lower]
-        
-        student_skills_str = ', '.join(student_skills) if student_skills else 'No skills listed'
+
+        # Plans depend only on the role, company, job skills and gap, so
+        # students with the same gap for the same job share one generated plan.
+        job_role_key, company_key, job_skills_key, missing_key = ImprovementPlanCache.normalize(
+            job_role, company, job_skills, missing_skills)
+        cache_key = ImprovementPlanCache.key(job_role_key, company_key, job_skills_key, missing_key)
+        cached_plan = IMPROVEMENT_PLANS.get(cache_key)
+        if cached_plan is not None:
+            return jsonify({"success": True, "plan": cached_plan, "cached": True})
+
+        if not AI.available():
+            return jsonify({"error": "AI model not available"}), 503
+
         job_skills_str = ', '.join(job_skills) if job_skills else 'No specific skills listed'
         missing_skills_str = ', '.join(missing_skills) if missing_skills else 'None (Good match!)'
         
         prompt = f"""Generate a concise, actionable improvement plan for a student aiming for a '{job_role}' role at '{company}'.
 
-Student's current skills: {student_skills_str}
 Required skills for the job: {job_skills_str}
 Identified skill gaps: {missing_skills_str}
 
@@ -960,7 +3630,7 @@ Provide 3-5 specific, actionable steps focused on bridging the gaps. Include:
 
 Format as bullet points. Be brief and encouraging. Start directly with the plan."""
         
-        response = GEMINI_MODEL.generate_content(prompt)
+        response = AI.generate(prompt)
         
         # Safely extract text from response
         if not response or not hasattr(response, 'text'):
@@ -971,6 +3641,7 @@ Format as bullet points. Be brief and encouraging. Start directly with the plan.
             return jsonify({"error": "AI model returned empty response"}), 500
             
         text = text.strip()
+        IMPROVEMENT_PLANS.set(cache_key, job_role_key, company_key, missing_key, text)
         
         return jsonify({"success": True, "plan": text})
         
@@ -986,23 +3657,27 @@ def all_internship_opportunity():
         return redirect(url_for('student_login'))
 
     student_id = session['user_id'] 
+    student = Student.query.get(student_id)
     selected_location = request.args.get('location')
     page_title = "Browse Job & Internship Opportunities"
     jobs_with_scores = [] 
+    page, pages, total_jobs = 1, 1, 0
     if selected_location:
-        all_jobs_in_location = JobPosting.query.filter_by(location=selected_location).order_by(JobPosting.created_at.desc()).all()
+        all_jobs_in_location = JobPosting.query.options(joinedload(JobPosting.company))\
+            .filter_by(location=selected_location).order_by(JobPosting.created_at.desc()).all()
         page_title = f"Jobs in {selected_location}"
-        for job in all_jobs_in_location:
-            fit_score = get_fit_score_for_application(student_id, job.id)
-            jobs_with_scores.append({'job': job, 'score': fit_score})
-        
-        jobs_with_scores.sort(key=lambda x: x['score'], reverse=True)
+        # Every job is scored, best first; a page keeps only its slice of the top page * limit.
+        total_jobs = len(all_jobs_in_location)
+        pages = max(1, -(-total_jobs // LOCATION_RESULTS_LIMIT))
+        page = min(max(request.args.get('page', 1, type=int), 1), pages)
+        jobs_with_scores = get_fit_scores_for_student(student, all_jobs_in_location,
+                                                      top_k=page * LOCATION_RESULTS_LIMIT)
+        jobs_with_scores = jobs_with_scores[(page - 1) * LOCATION_RESULTS_LIMIT:]
     else:
-        recommendations = get_recommendations(student_id)
+        recommendations = get_cached_recommendations(student)
         jobs_with_scores = recommendations
         page_title = "Jobs Recommended For You"
 
-    student = Student.query.get(student_id)
     applied_job_ids = {app.job_id for app in student.applications}
 
     return render_template('all_internship_opportunity.html',
@@ -1010,7 +3685,34 @@ def all_internship_opportunity():
                            applied_job_ids=applied_job_ids,
                            cities=INDIAN_IT_CITIES,
                            selected_location=selected_location,
-                           page_title=page_title)
+                           page_title=page_title,
+                           page=page,
+                           pages=pages,
+                           total_jobs=total_jobs,
+                           first_result=(page - 1) * LOCATION_RESULTS_LIMIT + 1)
+
+
+@app.route('/api/jobs_by_skill')
+def api_jobs_by_skill():
+    if not session.get('logged_in'):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    skill = request.args.get('skill', '')
+    if not normalize_skill(skill):
+        return jsonify({"error": "A skill is required"}), 400
+
+    jobs = jobs_requiring_skill(skill).options(joinedload(JobPosting.company))\
+        .order_by(JobPosting.created_at.desc()).limit(100).all()
+    return jsonify({
+        "skill": normalize_skill(skill),
+        "jobs": [{
+            "id": job.id,
+            "job_role": job.job_role,
+            "company": job.company.company_name,
+            "location": job.location,
+            "cgpa_required": job.cgpa_required
+        } for job in jobs]
+    })
 
 
 @app.route('/apply_job/<int:job_id>')
@@ -1206,13 +3908,36 @@ def post_job():
         )
         
         db.session.add(job)
+        db.session.flush()
+        sync_job_skills(job.id, skills_list)
         db.session.commit()
+        JOB_INDEX.add_job(job)
+        queue_job_fit_refresh(job.id)
         flash('Job posted successfully!', 'success')
         return redirect(url_for('company_profile'))
 
     return render_template('post_job.html', cities=INDIAN_IT_CITIES)
 
 
+@app.route('/delete_job/<int:job_id>', methods=['POST'])
+def delete_job(job_id):
+    if session.get('role') != 'company':
+        return redirect(url_for('company_login'))
+
+    job = JobPosting.query.get_or_404(job_id)
+    if job.company_id != session['user_id']:
+        flash('You are not authorized to delete this job.', 'error')
+        return redirect(url_for('company_profile'))
+
+    FitScore.query.filter_by(job_id=job_id).delete()
+    Recommendation.query.filter_by(job_id=job_id).delete()
+    db.session.delete(job)
+    db.session.commit()
+    JOB_INDEX.remove_job(job_id)
+    flash('Job posting deleted.', 'success')
+    return redirect(url_for('company_profile'))
+
+
 @app.route('/applicants/<int:job_id>')
 def applicants(job_id):
     if session.get('role') != 'company':
@@ -1224,19 +3949,56 @@ def applicants(job_id):
         flash('You are not authorized to view applicants for this job.', 'error')
         return redirect(url_for('company_dashboard'))
 
-    applications = JobApplication.query.filter_by(job_id=job_id).order_by(JobApplication.applied_at.asc()).all()
+    applications = JobApplication.query.options(joinedload(JobApplication.student))\
+        .filter_by(job_id=job_id).order_by(JobApplication.applied_at.asc()).all()
 
+    fit_scores = get_fit_scores_for_job(job, [app.student_id for app in applications])
     applications_with_scores = []
     for app in applications:
-        fit_score = get_fit_score_for_application(app.student_id, job_id)
         applications_with_scores.append({
             'application': app,
-            'fit_score': fit_score
+            'fit_score': fit_scores.get(app.student_id, 0)
         })
 
     return render_template('applicants.html', job=job, applications_with_scores=applications_with_scores)
 
 
+@app.route('/api/top_candidates/<int:job_id>')
+def api_top_candidates(job_id):
+    if session.get('role') != 'company':
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = JobPosting.query.get_or_404(job_id)
+    if job.company_id != session['user_id']:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    limit = min(request.args.get('n', 20, type=int), 100)
+    college = request.args.get('college')
+    if college and college not in BPUT_COLLEGES:
+        return jsonify({"error": "Invalid college specified"}), 400
+
+    applied_student_ids = {student_id for (student_id,) in
+                           db.session.query(JobApplication.student_id).filter_by(job_id=job_id)}
+    candidates, ready = get_top_candidates(job, limit=limit, college=college)
+    if not ready:
+        # The column is being built in the background; poll again shortly.
+        return jsonify({"job_id": job.id, "status": "computing", "candidates": []}), 202
+
+    return jsonify({
+        "job_id": job.id,
+        "status": "ready",
+        "candidates": [{
+            "student_id": student.id,
+            "full_name": student.full_name,
+            "college": student.college,
+            "cgpa": student.cgpa,
+            "fit_score": round(score, 2),
+            "has_applied": student.id in applied_student_ids,
+            "profile_url": url_for('view_applicant', student_id=student.id)
+        } for score, student in candidates]
+    })
+
+
 @app.route('/update_application_status/<int:application_id>', methods=['POST'])
 def update_application_status(application_id):
     if session.get('role') != 'company':
@@ -1261,9 +4023,14 @@ def update_application_status(application_id):
                 "endDate": "2099-02-18T14:23:00.000Z",
                 "fields": ["hostRoomUrl"],
             }
-            response = requests.post("https://api.whereby.dev/v1/meetings", headers=headers, json=payload)
+            try:
+                response = requests.post(f"{WHEREBY_API_URL}/meetings", headers=headers, json=payload,
+                                         timeout=WHEREBY_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                print(f"Whereby API Error: {e}")
+                response = None
 
-            if response.status_code == 201:
+            if response is not None and response.status_code == 201:
                 data = response.json()
                 application.video_room_url = data.get('roomUrl')
                 flash('Applicant accepted and a video call room has been created.', 'success')
@@ -1428,22 +4195,8 @@ def university_dashboard():
         flash('Please log in to access the university dashboard.', 'error')
         return redirect(url_for('university_login'))
 
-    college_stats = []
-    
-    fake_company_participation = [random.randint(5, 15) for _ in BPUT_COLLEGES]
-    fake_avg_package = [round(random.uniform(4.5, 8.5), 1) for _ in BPUT_COLLEGES]
-
-    for i, college in enumerate(BPUT_COLLEGES):
-        students = Student.query.filter_by(college=college).all()
-        stats = calculate_placement_stats(students)
-
-        college_stats.append({
-            'name': college,
-            'total_students': stats['total'],
-            'placed_students': stats['placed'],
-            'companies_participated': fake_company_participation[i],
-            'avg_package': fake_avg_package[i]
-        })
+    stats = university_placement_stats()
+    college_stats = stats['colleges']
 
     overall_placed = sum(cs['placed_students'] for cs in college_stats)
     overall_total = sum(cs['total_students'] for cs in college_stats)
@@ -1451,7 +4204,9 @@ def university_dashboard():
 
     return render_template('university_dashboard.html',
                            college_stats=college_stats,
-                           overall_rate=round(overall_rate, 1))
+                           overall_rate=round(overall_rate, 1),
+                           total_companies=stats['companies'],
+                           avg_package=stats['avg_package'])
 
 
 @app.route('/university_dashboard/<college_name>')
@@ -1464,27 +4219,17 @@ def college_placement_details(college_name):
         flash('Invalid college specified.', 'error')
         return redirect(url_for('university_dashboard'))
 
-    students = Student.query.filter_by(college=college_name).order_by(Student.full_name).all()
-
-    student_placement_data = []
-    for student in students:
-        accepted_app = JobApplication.query\
-            .join(JobPosting, JobApplication.job_id == JobPosting.id)\
-            .join(Company, JobPosting.company_id == Company.id)\
-            .filter(JobApplication.student_id == student.id)\
-            .filter(JobApplication.status == 'Accepted')\
-            .add_columns(Company.company_name)\
-            .first()
-
-        student_placement_data.append({
-            'info': student,
-            'is_placed': bool(accepted_app),
-            'company_name': accepted_app.company_name if accepted_app else None
-        })
+    after_id = request.args.get('after_id', type=int)
+    before_id = request.args.get('before_id', type=int)
+    after = (request.args.get('after_name', ''), after_id) if after_id is not None else None
+    before = (request.args.get('before_name', ''), before_id) if before_id is not None and after is None else None
 
+    placement_page = college_placement_page(college_name, after=after, before=before)
     return render_template('college_placement_details.html',
                            college_name=college_name,
-                           student_data=student_placement_data)
+                           student_data=placement_page['students'],
+                           previous_cursor=placement_page['previous'],
+                           next_cursor=placement_page['next'])
 
 
 @app.route('/university/verify_companies')
@@ -1607,42 +4352,42 @@ def college_dashboard():
         return redirect(url_for('college_login'))
     
     college_name = session['college_name']
-    students = Student.query.filter_by(college=college_name).order_by(Student.full_name).all()
-    student_data = []
-    
-    for student in students:
-        applications = JobApplication.query.filter_by(student_id=student.id).all()
-        placement_status = "N/A" 
-        placed_company = None
-        has_applied = False
-        has_rejected = False
-
-        if applications:
-             has_applied = True 
-             accepted_app = next((app for app in applications if app.status == 'Accepted'), None)
-             if accepted_app:
-                 placement_status = 'Accepted'
-                 job_posting = JobPosting.query.get(accepted_app.job_id)
-                 if job_posting and job_posting.company: 
-                     placed_company = job_posting.company.company_name
-             else:
-                 if any(app.status == 'Rejected' for app in applications):
-                      placement_status = 'Rejected'
-                 else:
-                      placement_status = 'Applied' 
-
-        student_data.append({
-            'info': student,
-            'application_count': len(applications),
-            'placement_status': placement_status,
-            'placed_company': placed_company
-        })
-
+    status = request.args.get('status')
+    if status not in PLACEMENT_STATUSES:
+        status = None
+    sort = request.args.get('sort', 'name')
+    descending = request.args.get('order') == 'desc'
+    page = request.args.get('page', 1, type=int)
+
+    overview = college_student_overview(college_name, status=status, sort=sort, descending=descending, page=page)
     return render_template('college_dashboard.html',
-                           student_data=student_data,
+                           student_data=overview['students'],
+                           status_counts=overview['status_counts'],
+                           total_students=overview['total'],
+                           matching_students=overview['matching'],
+                           page=overview['page'],
+                           pages=overview['pages'],
+                           status=status,
+                           sort=sort,
+                           order='desc' if descending else 'asc',
                            college_name=college_name)
 
 
+@app.route('/college/resumes.zip')
+def college_resumes_zip():
+    if session.get('role') != 'college':
+        flash('Please log in to access the college dashboard.', 'error')
+        return redirect(url_for('college_login'))
+
+    college_name = session['college_name']
+    filename = secure_filename(f'{college_name}_resumes.zip') or 'resumes.zip'
+    return app.response_class(stream_with_context(stream_college_resumes(college_name)),
+                              mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',
+    })
+
+
 # ==================== NOTIFICATION API ENDPOINTS ====================
 
 def create_notification(user_id, user_role, title, message, link=None):
@@ -1790,6 +4535,65 @@ def not_found(error):
     return render_template('404.html'), 404
 
 
+# ==================== CLI COMMANDS ====================
+
+@app.cli.command('backfill-skills')
+def backfill_skills_command():
+    """Fills the normalized skill tables from the JSON skills columns."""
+    students = Student.query.with_entities(Student.id, Student.skills).all()
+    for student in students:
+        sync_student_skills(student.id, parse_skills(student.skills))
+
+    jobs = JobPosting.query.with_entities(JobPosting.id, JobPosting.required_skills).all()
+    for job in jobs:
+        sync_job_skills(job.id, parse_skills(job.required_skills))
+
+    db.session.commit()
+    print(f"Indexed skills for {len(students)} students and {len(jobs)} jobs ({Skill.query.count()} distinct skills).")
+
+
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+
+@app.cli.command('import-report')
+@click.option('--top', default=15, show_default=True, help='Number of modules to list.')
+@click.option('--budget', default=IMPORT_TIME_BUDGET_MS, show_default=True, help='Cold-start budget in milliseconds.')
+def import_report_command(top, budget):
+    """Imports the app in a fresh interpreter and prints the slowest modules."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(result.returncode)
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with two spaces of indentation per nesting level. Modules app.py imports
+    # directly sit one level below the "app" entry, which carries the total.
+    total, direct = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == 'app':
+            total = int(cumulative) / 1000
+        elif depth == 1:
+            direct.append((int(cumulative) / 1000, name.strip()))
+
+    print(f"{'module':<45} {'ms':>9}")
+    for ms, name in heapq.nlargest(top, direct):
+        print(f"{name:<45} {ms:>9.1f}")
+    print(f"{'total (import app)':<45} {total:>9.1f}")
+
+    if total > budget:
+        print(f"❌ Cold start of {total:.0f} ms is over the {budget} ms budget.")
+        raise SystemExit(1)
+    print(f"✅ Cold start within the {budget} ms budget.")
+
+
+
 if __name__ == '__main__':
     with app.app_context():
         
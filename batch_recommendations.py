@@ -0,0 +1,77 @@
+"""Nightly batch job: precomputes top-5 recommendations for every student.
+
+Colleges are scored in parallel worker processes and the results are written to
+the Recommendation table, which /student_profile reads with a single query.
+Students whose profile changes after the batch are recomputed live on their
+next visit.
+
+Schedule it from cron, e.g.:
+    0 2 * * * cd /srv/elevatr && python batch_recommendations.py --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app import app, db, Student, BPUT_COLLEGES, get_recommendations, latest_job_id, student_profile_fingerprint, \
+    save_recommendations
+
+
+def recommend_for_college(college):
+    """Runs in a worker process; returns plain data so results pickle cheaply.
+
+    The newest job id is read before any scoring, so a posting that lands while
+    the college is being scored is not recorded as considered.
+    """
+    with app.app_context():
+        newest_job_id = latest_job_id()
+        results = []
+        for student in Student.query.filter_by(college=college).all():
+            recommendations = get_recommendations(student.id)
+            results.append((
+                student.id,
+                student_profile_fingerprint(student),
+                [(rec['job'].id, rec['score'], rec['roadmap']) for rec in recommendations]
+            ))
+        return college, newest_job_id, results
+
+
+def run_batch(workers):
+    started = time.monotonic()
+    total_students = 0
+
+    # spawn keeps workers from inheriting the parent's database connections.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(recommend_for_college, college): college for college in BPUT_COLLEGES}
+        for future in as_completed(futures):
+            college = futures[future]
+            try:
+                _, newest_job_id, results = future.result()
+            except Exception as e:
+                print(f"❌ Failed to compute recommendations for {college}: {e}")
+                continue
+
+            with app.app_context():
+                try:
+                    for student_id, profile_hash, ranked_jobs in results:
+                        save_recommendations(student_id, profile_hash, ranked_jobs, newest_job_id)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Failed to store recommendations for {college}: {e}")
+                    continue
+
+            total_students += len(results)
+            print(f"✅ {college}: {len(results)} students")
+
+    print(f"\nBatch finished: {total_students} students in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='number of worker processes (default: CPU count)')
+    args = parser.parse_args()
+    run_batch(args.workers)
@@ -0,0 +1,14 @@
+"""Recommendation and dashboard benchmarks for ElevatR.
+
+Generates a synthetic university into a scratch database and times the scoring
+paths and dashboards against it:
+
+    python -m benchmarks --scale 10000 --database-url sqlite:///bench.db --output bench.json
+
+The AI and video-room endpoints have their own load test, run against the
+local stand-in server in fake_ai_server.py:
+
+    python -m benchmarks.ai_load --concurrency 16 --requests 200
+
+See `python -m benchmarks --help` for the options.
+"""
@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='ElevatR recommendation benchmarks')
+    parser.add_argument('--scale', type=int, default=1000,
+                        help='number of synthetic students, 1000-100000 (default: 1000)')
+    parser.add_argument('--database-url', default=os.getenv('BENCHMARK_DATABASE_URL', 'sqlite:///benchmark.db'),
+                        help='scratch database; every table in it is dropped (default: sqlite:///benchmark.db)')
+    parser.add_argument('--skip-generate', action='store_true', help='reuse data from a previous run')
+    parser.add_argument('--samples', type=int, default=50, help='timed calls per benchmark (default: 50)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed calls per benchmark (default: 1)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='previous JSON report to compare p95 latencies against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='allowed p95 growth over the baseline as a fraction (default: 0.2)')
+    args = parser.parse_args()
+
+    # app reads DATABASE_URL at import time.
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('JOB_INDEX_REFIT_INTERVAL', '0')
+    os.environ.setdefault('UNIVERSITY_STATS_TTL', '0')  # time the query, not the cache
+    from app import app
+    from benchmarks.synthetic import generate, scale_plan
+    from benchmarks.runner import run_benchmarks, compare
+
+    with app.app_context():
+        if args.skip_generate:
+            plan = scale_plan(args.scale)
+        else:
+            print(f"Generating {args.scale} students into {args.database_url}...", file=sys.stderr)
+            plan = generate(args.scale)
+        print("Running benchmarks...", file=sys.stderr)
+        results = run_benchmarks(samples=args.samples, warmup=args.warmup)
+
+    report = {'scale': plan, 'database': args.database_url.split('://')[0], 'results': results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Concurrent load test of the AI and video-room endpoints against fake_ai_server.py.
+
+Start the fake server, generate benchmark data once (for the application
+scenario), then:
+
+    python fake_ai_server.py --gemini-latency lognormal:800:0.4 --error-rate 0.02 &
+    python -m benchmarks --scale 1000 --output bench.json
+    python -m benchmarks.ai_load --concurrency 16 --requests 200 --output ai_load.json
+
+Every request uses a unique question or skill gap, so the response caches are
+bypassed unless --with-cache is given.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+SCENARIOS = ['chatbot', 'chatbot_stream', 'improvement_plan', 'accept_application']
+
+
+def run_scenario(name, concurrency, total):
+    from app import app, AI, JobApplication, JobPosting
+    from benchmarks.runner import logged_in_client, summarise
+
+    work = list(range(total))
+    if name == 'accept_application':
+        with app.app_context():
+            work = JobApplication.query.join(JobPosting, JobApplication.job_id == JobPosting.id)\
+                .filter(JobApplication.status == 'Applied', JobApplication.video_room_url.is_(None))\
+                .with_entities(JobApplication.id, JobPosting.company_id).limit(total).all()
+        if not work:
+            return {'skipped': 'no open applications; run python -m benchmarks first'}
+
+    latencies, first_byte, errors = [], [], []
+    lock = threading.Lock()
+
+    def one(item):
+        token = uuid.uuid4().hex[:8]
+        started = time.perf_counter()
+        ttfb = None
+        try:
+            if name == 'chatbot':
+                with logged_in_client('student') as client:
+                    response = client.post('/chatbot_api', json={'message': f'How should I prepare for interview {token}?'})
+                ok = response.status_code == 200 and 'trouble connecting' not in response.get_json()['reply']
+            elif name == 'chatbot_stream':
+                with logged_in_client('student') as client:
+                    response = client.post('/chatbot_stream', json={'message': f'Resume tips for {token}'}, buffered=False)
+                    body = ''
+                    for data in response.response:
+                        if ttfb is None:
+                            ttfb = (time.perf_counter() - started) * 1000
+                        body += data.decode() if isinstance(data, bytes) else data
+                    response.close()
+                ok = 'event: error' not in body
+            elif name == 'improvement_plan':
+                with logged_in_client('student') as client:
+                    response = client.post('/api/generate_improvement_plan', json={
+                        'jobRole': 'Backend Developer', 'company': f'Company {token}',
+                        'studentSkills': ['Python'], 'jobSkills': ['Python', 'Docker', f'skill-{token}'],
+                    })
+                ok = response.status_code == 200
+            else:
+                application_id, company_id = item
+                with logged_in_client('company', company_id) as client:
+                    response = client.post(f'/update_application_status/{application_id}', data={'status': 'Accepted'})
+                ok = response.status_code == 302
+        except Exception as e:
+            ok = False
+            print(f"{name}: {e}", file=sys.stderr)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if ttfb is not None:
+                first_byte.append(ttfb)
+            if not ok:
+                errors.append(item)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, work))
+    wall = time.perf_counter() - started
+
+    result = summarise(latencies, [])
+    for key in ('queries_mean', 'queries_max'):
+        result.pop(key)
+    result.update(errors=len(errors), throughput_rps=round(len(work) / wall, 2), gateway=AI.status())
+    if first_byte:
+        result['first_byte'] = {k: v for k, v in summarise(first_byte, []).items() if k.endswith('_ms')}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.ai_load', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fake-server', default='http://127.0.0.1:8765', help='fake_ai_server.py base URL')
+    parser.add_argument('--database-url', default=os.getenv('BENCHMARK_DATABASE_URL', 'sqlite:///benchmark.db'))
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='scenario to run; repeat for several (default: all)')
+    parser.add_argument('--concurrency', type=int, default=16, help='simultaneous requests (default: 16)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario (default: 200)')
+    parser.add_argument('--with-cache', action='store_true', help='leave the chatbot answer cache enabled')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    # app reads these at import time.
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('JOB_INDEX_REFIT_INTERVAL', '0')
+    os.environ.setdefault('GOOGLE_API_KEY', 'fake')
+    os.environ['GEMINI_API_ENDPOINT'] = args.fake_server
+    os.environ['WHEREBY_API_URL'] = f"{args.fake_server.rstrip('/')}/v1"
+    if not args.with_cache:
+        os.environ['CHATBOT_CACHE_THRESHOLD'] = '1.01'  # exact repeats only; every question here is unique
+
+    import requests
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        print(f"Running {name} x{args.requests} at concurrency {args.concurrency}...", file=sys.stderr)
+        results[name] = run_scenario(name, args.concurrency, args.requests)
+
+    report = {
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'results': results,
+        'fake_server': requests.get(f"{args.fake_server.rstrip('/')}/stats", timeout=5).json(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Calibrates the chatbot answer cache threshold against labelled question pairs.
+
+Scores every pair the way SemanticAnswerCache.get() does (similarity plus the
+exact-term check) and reports, per threshold, how many true paraphrases would
+be answered from the cache and how many different questions would wrongly be:
+
+    python -m benchmarks.chatbot_cache
+"""
+import os
+import sys
+
+
+PARAPHRASES = [
+    ("How do I improve my resume?", "How can I improve my resume?"),
+    ("How can I improve my resume", "how to improve my resume"),
+    ("What skills are needed for a data scientist?", "What skills do I need to become a data scientist?"),
+    ("How to prepare for a technical interview", "How should I prepare for technical interviews?"),
+    ("Tips for writing a cover letter", "Give me tips for writing a cover letter"),
+    ("How do I register on the portal?", "how to register on the portal"),
+    ("What is a good CGPA for placements?", "what is a good cgpa for placement"),
+    ("How can I get an internship?", "How do I get an internship"),
+    ("Which programming language should I learn first?", "What programming language should I learn first?"),
+    ("How to prepare for Google interview", "How do I prepare for a Google interview?"),
+    ("What projects should I add to my resume?", "Which projects should I put on my resume?"),
+    ("How do I upload a certificate?", "how can i upload certificates"),
+    ("Is 7.5 CGPA enough for Google?", "Is a 7.5 CGPA enough for Google"),
+    ("How to learn machine learning?", "How do I learn machine learning"),
+    ("best way to learn python", "What is the best way to learn Python?"),
+]
+NON_PARAPHRASES = [
+    ("Is 7.5 CGPA enough for Google?", "Is 6.5 CGPA enough for Google?"),
+    ("How to prepare for Google interview", "How to prepare for Amazon interview"),
+    ("How to prepare for a Google interview?", "How to prepare for a Microsoft interview?"),
+    ("Can I apply without a resume?", "Can I apply with a resume?"),
+    ("How do I improve my resume?", "How do I improve my LinkedIn profile?"),
+    ("What skills are needed for a data scientist?", "What skills are needed for a web developer?"),
+    ("How to learn Python?", "How to learn Java?"),
+    ("How to learn machine learning?", "How to learn deep learning?"),
+    ("How do I upload a certificate?", "How do I delete a certificate?"),
+    ("What is a good CGPA for placements?", "What is a good CGPA for higher studies?"),
+    ("How can I get an internship?", "How can I get a full time job?"),
+    ("Tips for writing a cover letter", "Tips for writing a resignation letter"),
+    ("Which companies hire freshers in Bangalore?", "Which companies hire freshers in Pune?"),
+    ("Is 8 CGPA good for TCS?", "Is 8 CGPA good for Infosys?"),
+    ("How to register on the portal", "How to log in to the portal"),
+    ("What is the salary of a software engineer at Amazon?", "What is the salary of a data analyst at Amazon?"),
+    ("How many projects should I put on my resume?", "How many certificates should I put on my resume?"),
+]
+
+# Stands in for registered company names so the check works without a database.
+COMPANY_NAMES = frozenset({'google', 'amazon', 'microsoft', 'tcs', 'infosys'})
+THRESHOLDS = [0.5, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9]
+
+
+def main():
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    from app import SemanticAnswerCache, CHATBOT_CACHE_THRESHOLD
+
+    cache = SemanticAnswerCache(1, 0.0, entity_names=lambda: COMPANY_NAMES)
+
+    def score(a, b):
+        qa, qb = cache.normalize(a), cache.normalize(b)
+        similarity = (cache._vectorize(qa) @ cache._vectorize(qb).T).toarray()[0, 0]
+        terms_match = cache._contains_terms(qb, cache.key_terms(a, qa)) and \
+            cache._contains_terms(qa, cache.key_terms(b, qb))
+        return similarity, terms_match
+
+    scored = {'paraphrase': [score(a, b) for a, b in PARAPHRASES],
+              'different': [score(a, b) for a, b in NON_PARAPHRASES]}
+    for label, pairs in (('paraphrase', PARAPHRASES), ('different', NON_PARAPHRASES)):
+        for (a, b), (similarity, terms_match) in zip(pairs, scored[label]):
+            print(f"{label:<10} {similarity:.3f} {'terms ok' if terms_match else 'terms differ':<12} {a} | {b}")
+
+    print(f"\n{'threshold':<10} {'reused paraphrases':>20} {'wrong answers':>15}")
+    for threshold in THRESHOLDS:
+        hits = sum(s >= threshold and ok for s, ok in scored['paraphrase'])
+        wrong = sum(s >= threshold and ok for s, ok in scored['different'])
+        marker = '  <- CHATBOT_CACHE_THRESHOLD' if abs(threshold - CHATBOT_CACHE_THRESHOLD) < 1e-9 else ''
+        print(f"{threshold:<10} {hits:>14}/{len(PARAPHRASES):<5} {wrong:>9}/{len(NON_PARAPHRASES):<5}{marker}")
+    sys.exit(1 if any(s >= CHATBOT_CACHE_THRESHOLD and ok for s, ok in scored['different']) else 0)
+
+
+if __name__ == '__main__':
+    main()
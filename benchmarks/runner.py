@@ -0,0 +1,126 @@
+"""Times the scoring paths and dashboards and summarises latency and query counts."""
+import random
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import (
+    app, db, Student, JobPosting, JobApplication, BPUT_COLLEGES,
+    get_recommendations, get_fit_score_for_application, get_fit_scores_for_job,
+)
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarise(latencies_ms, query_counts):
+    latencies_ms = sorted(latencies_ms)
+    return {
+        'samples': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p90_ms': round(percentile(latencies_ms, 90), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'max_ms': round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        'queries_mean': round(sum(query_counts) / len(query_counts), 1) if query_counts else 0.0,
+        'queries_max': max(query_counts) if query_counts else 0,
+    }
+
+
+def time_calls(counter, fn, argument_sets, warmup=1):
+    """Calls fn(*args) for each argument set; the first `warmup` calls are not recorded."""
+    latencies, queries = [], []
+    for i, args in enumerate(argument_sets):
+        db.session.expunge_all()
+        before = counter.count
+        started = time.perf_counter()
+        fn(*args)
+        elapsed = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(counter.count - before)
+    return summarise(latencies, queries)
+
+
+@contextmanager
+def logged_in_client(role, user_id=1, **session_values):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(logged_in=True, role=role, user_id=user_id, **session_values)
+    yield client
+
+
+def get_page(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+
+def run_benchmarks(samples=50, warmup=1, seed=7):
+    """Returns {benchmark name: latency and query summary}."""
+    rng = random.Random(seed)
+    counter = QueryCounter(db.engine)
+
+    student_ids = [student_id for (student_id,) in db.session.query(Student.id)]
+    job_ids = [job_id for (job_id,) in db.session.query(JobPosting.id)]
+    busiest_jobs = [job_id for (job_id, _) in db.session.query(JobApplication.job_id, db.func.count())
+                    .group_by(JobApplication.job_id).order_by(db.func.count().desc()).limit(samples + warmup)]
+
+    pick_students = [rng.choice(student_ids) for _ in range(samples + warmup)]
+    pick_pairs = [(rng.choice(student_ids), rng.choice(job_ids)) for _ in range(samples + warmup)]
+
+    def applicants_batch(job_id):
+        job = JobPosting.query.get(job_id)
+        applicant_ids = [sid for (sid,) in db.session.query(JobApplication.student_id).filter_by(job_id=job_id)]
+        return get_fit_scores_for_job(job, applicant_ids)
+
+    results = {
+        'get_recommendations': time_calls(counter, get_recommendations, [(s,) for s in pick_students], warmup),
+        'get_fit_score_for_application': time_calls(counter, get_fit_score_for_application, pick_pairs, warmup),
+        'applicants_batch_scoring': time_calls(counter, applicants_batch, [(j,) for j in busiest_jobs], warmup),
+    }
+
+    page_samples = max(1, samples // 5)
+    with logged_in_client('university') as client:
+        results['university_dashboard'] = time_calls(
+            counter, get_page, [(client, '/university_dashboard')] * (page_samples + warmup), warmup)
+    college_clients = []
+    for college in BPUT_COLLEGES:
+        with logged_in_client('college', college_name=college) as client:
+            college_clients.append(client)
+    results['college_dashboard'] = time_calls(counter, get_page, [
+        (college_clients[i % len(college_clients)], '/college_dashboard') for i in range(page_samples + warmup)
+    ], warmup)
+
+    return results
+
+
+def compare(current, baseline, max_regression):
+    """Lists benchmarks whose p95 grew by more than max_regression (a fraction)."""
+    regressions = []
+    for name, summary in current.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('p95_ms'):
+            continue
+        growth = (summary['p95_ms'] - previous['p95_ms']) / previous['p95_ms']
+        if growth > max_regression:
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {summary['p95_ms']}ms (+{growth:.0%})")
+    return regressions
@@ -0,0 +1,136 @@
+"""Synthetic data generator for benchmarks.
+
+All rows are written with bulk inserts in chunks, so a 100k-student university
+takes minutes rather than hours. Skills are drawn from SKILL_RESOURCES plus a
+tail of rarer skills, so TF-IDF vocabularies and roadmaps look realistic.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import (
+    db, Company, Student, StudentProject, Certificate, JobPosting, JobApplication,
+    Skill, StudentSkill, JobSkill, BPUT_COLLEGES, INDIAN_IT_CITIES, SKILL_RESOURCES,
+)
+
+EXTRA_SKILLS = [
+    'docker', 'kubernetes', 'aws', 'azure', 'git', 'linux', 'django', 'spring boot',
+    'node.js', 'typescript', 'mongodb', 'postgresql', 'tensorflow', 'pytorch',
+    'data structures', 'power bi', 'excel', 'figma', 'go', 'rust', 'android', 'kotlin',
+]
+SKILLS = list(SKILL_RESOURCES) + EXTRA_SKILLS
+ROLES = [
+    'Software Engineer', 'Data Analyst', 'Backend Developer', 'Frontend Developer',
+    'ML Engineer', 'DevOps Engineer', 'Full Stack Developer', 'QA Engineer',
+]
+FIRST_NAMES = ['Aarav', 'Ananya', 'Rohan', 'Priya', 'Subham', 'Sneha', 'Aditya', 'Ipsita', 'Rahul', 'Swati']
+LAST_NAMES = ['Mohanty', 'Das', 'Patnaik', 'Sahoo', 'Mishra', 'Nayak', 'Behera', 'Panda', 'Rath', 'Swain']
+STATUSES = ['Applied'] * 6 + ['Accepted'] * 2 + ['Rejected'] * 2
+
+CHUNK_SIZE = 5000
+
+
+def scale_plan(students):
+    """Row counts for a given number of students."""
+    return {
+        'students': students,
+        'companies': max(5, students // 200),
+        'jobs': max(10, students // 20),
+        'projects': int(students * 1.5),
+        'certificates': students,
+        'applications': students * 3,
+    }
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.bulk_insert_mappings(model, rows[start:start + CHUNK_SIZE])
+    db.session.commit()
+
+
+def generate(students, seed=42):
+    """Drops and recreates every table, then fills them for `students` students."""
+    rng = random.Random(seed)
+    plan = scale_plan(students)
+    password_hash = generate_password_hash('bench1234')
+    now = datetime.utcnow()
+
+    db.drop_all()
+    db.create_all()
+
+    _insert(Skill, [{'id': i + 1, 'name': name} for i, name in enumerate(SKILLS)])
+    skill_ids = {name: i + 1 for i, name in enumerate(SKILLS)}
+
+    _insert(Company, [{
+        'id': i + 1,
+        'company_name': f'Bench Company {i + 1}',
+        'email': f'hr{i + 1}@bench-company.in',
+        'password_hash': password_hash,
+        'status': 'approved',
+        'description': 'Synthetic company for benchmarks.',
+    } for i in range(plan['companies'])])
+
+    jobs, job_skills = [], []
+    for i in range(plan['jobs']):
+        role = rng.choice(ROLES)
+        skills = rng.sample(SKILLS, rng.randint(3, 6))
+        salary_min = rng.choice([None, rng.randint(3, 6) * 100000])
+        jobs.append({
+            'id': i + 1,
+            'company_id': rng.randint(1, plan['companies']),
+            'job_role': role,
+            'description': f"Seeking a {role} comfortable with {', '.join(skills)}.",
+            'required_skills': json.dumps([s.title() for s in skills]),
+            'cgpa_required': rng.choice([6.0, 6.5, 7.0, 7.5, 8.0]),
+            'location': rng.choice(INDIAN_IT_CITIES),
+            'salary_min': salary_min,
+            'salary_max': rng.randint(7, 15) * 100000 if salary_min else None,
+            'created_at': now - timedelta(days=rng.randint(0, 180)),
+        })
+        job_skills.extend({'job_id': i + 1, 'skill_id': skill_ids[s]} for s in skills)
+    _insert(JobPosting, jobs)
+    _insert(JobSkill, job_skills)
+
+    student_rows, student_skills = [], []
+    for i in range(students):
+        skills = rng.sample(SKILLS, rng.randint(2, 8))
+        student_rows.append({
+            'id': i + 1,
+            'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i + 1}',
+            'email': f'student{i + 1}@bench.bput.ac.in',
+            'college': BPUT_COLLEGES[i % len(BPUT_COLLEGES)],
+            'registration_number': f'{i + 1:010d}',
+            'password_hash': password_hash,
+            'cgpa': round(rng.uniform(5.5, 9.8), 2),
+            'skills': json.dumps([s.title() for s in skills]),
+        })
+        student_skills.extend({'student_id': i + 1, 'skill_id': skill_ids[s]} for s in skills)
+    _insert(Student, student_rows)
+    _insert(StudentSkill, student_skills)
+
+    _insert(StudentProject, [{
+        'student_id': rng.randint(1, students),
+        'project_title': f'Project {i + 1}',
+        'description': f"Built a {rng.choice(ROLES).lower()} project using {', '.join(rng.sample(SKILLS, 3))}.",
+    } for i in range(plan['projects'])])
+
+    _insert(Certificate, [{
+        'student_id': rng.randint(1, students),
+        'title': f'{rng.choice(SKILLS).title()} Certification',
+        'filename': f'bench_cert_{i + 1}.png',
+    } for i in range(plan['certificates'])])
+
+    pairs = set()
+    while len(pairs) < min(plan['applications'], students * plan['jobs']):
+        pairs.add((rng.randint(1, students), rng.randint(1, plan['jobs'])))
+    _insert(JobApplication, [{
+        'student_id': student_id,
+        'job_id': job_id,
+        'status': rng.choice(STATUSES),
+        'applied_at': now - timedelta(days=rng.randint(0, 90)),
+    } for student_id, job_id in sorted(pairs)])
+
+    plan['applications'] = len(pairs)
+    return plan
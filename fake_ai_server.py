@@ -0,0 +1,199 @@
+"""Local stand-in for the Gemini and Whereby APIs, for load and latency testing.
+
+Serves the REST shapes the app uses:
+
+    POST /v1beta/models/<model>:generateContent
+    POST /v1beta/models/<model>:streamGenerateContent
+    POST /v1beta/models/<model>:countTokens
+    POST /v1/meetings
+    GET  /stats
+
+Start it, then point the app at it:
+
+    python fake_ai_server.py --port 8765 --gemini-latency lognormal:800:0.5 --error-rate 0.05
+    GOOGLE_API_KEY=fake GEMINI_API_ENDPOINT=http://127.0.0.1:8765 \
+        WHEREBY_API_URL=http://127.0.0.1:8765/v1 python app.py
+
+Latencies are given as <distribution>:<params> in milliseconds:
+fixed:MS, uniform:LOW:HIGH, normal:MEAN:SD, lognormal:MEDIAN:SIGMA.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import Flask, Response, jsonify, request
+
+
+class Latency:
+    """Samples delays in seconds from a distribution spec such as 'lognormal:800:0.5'."""
+
+    def __init__(self, spec):
+        kind, *params = spec.split(':')
+        params = [float(p) for p in params]
+        samplers = {
+            'fixed': lambda: params[0],
+            'uniform': lambda: random.uniform(params[0], params[1]),
+            'normal': lambda: random.gauss(params[0], params[1]),
+            'lognormal': lambda: params[0] * math.exp(random.gauss(0, params[1])),
+        }
+        if kind not in samplers:
+            raise argparse.ArgumentTypeError(f"unknown latency distribution '{kind}'")
+        self.spec = spec
+        self.sample_ms = samplers[kind]
+
+    def sleep(self):
+        time.sleep(max(self.sample_ms(), 0) / 1000)
+
+
+def create_server(options):
+    server = Flask(__name__)
+    stats = {'generate': 0, 'stream': 0, 'count_tokens': 0, 'meetings': 0, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 0}
+    lock = threading.Lock()
+
+    def track(key):
+        with lock:
+            stats[key] += 1
+            stats['in_flight'] += 1
+            stats['peak_in_flight'] = max(stats['peak_in_flight'], stats['in_flight'])
+
+    def done():
+        with lock:
+            stats['in_flight'] -= 1
+
+    def injected_error():
+        """Returns an error response for the configured share of requests."""
+        if random.random() >= options.error_rate:
+            return None
+        with lock:
+            stats['errors'] += 1
+        status = options.error_code
+        return jsonify({'error': {'code': status, 'message': 'Injected failure from fake_ai_server',
+                                  'status': 'UNAVAILABLE' if status == 503 else 'INTERNAL'}}), status
+
+    def prompt_text(body):
+        parts = [part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', [])]
+        return ' '.join(parts)
+
+    def reply_for(prompt):
+        # Certificate analysis asks for a JSON list; everything else gets prose.
+        if 'JSON list' in prompt:
+            return json.dumps(random.sample(options.skills, k=min(3, len(options.skills))))
+        words = ['placement', 'skills', 'project', 'resume', 'interview', 'practice', 'learn', 'apply', 'build', 'career']
+        return ' '.join(random.choice(words) for _ in range(options.reply_words)).capitalize() + '.'
+
+    def candidate(text, finish=True):
+        payload = {'content': {'parts': [{'text': text}], 'role': 'model'}, 'index': 0}
+        if finish:
+            payload['finishReason'] = 'STOP'
+        return {'candidates': [payload], 'usageMetadata': {'promptTokenCount': 10, 'candidatesTokenCount': len(text.split())}}
+
+    @server.route('/v1beta/models/<path:model_call>', methods=['POST'])
+    def models(model_call):
+        model, _, method = model_call.rpartition(':')
+        body = request.get_json(silent=True) or {}
+
+        if method == 'countTokens':
+            track('count_tokens')
+            try:
+                return jsonify({'totalTokens': len(prompt_text(body).split())})
+            finally:
+                done()
+
+        if method == 'generateContent':
+            track('generate')
+            try:
+                options.gemini_latency.sleep()
+                error = injected_error()
+                return error or jsonify(candidate(reply_for(prompt_text(body))))
+            finally:
+                done()
+
+        if method == 'streamGenerateContent':
+            track('stream')
+            options.gemini_latency.sleep()  # time to first token
+            error = injected_error()
+            if error:
+                done()
+                return error
+            words = reply_for(prompt_text(body)).split(' ')
+            size = max(1, math.ceil(len(words) / options.stream_chunks))
+            chunks = [' '.join(words[i:i + size]) + ' ' for i in range(0, len(words), size)]
+
+            def generate():
+                # A JSON array written element by element, as the REST API streams it
+                try:
+                    yield '['
+                    for i, chunk in enumerate(chunks):
+                        if i:
+                            time.sleep(options.chunk_delay_ms / 1000)
+                            yield ','
+                        yield json.dumps(candidate(chunk, finish=i == len(chunks) - 1))
+                    yield ']'
+                finally:
+                    done()
+
+            return Response(generate(), mimetype='application/json')
+
+        return jsonify({'error': {'code': 404, 'message': f'Unknown method {method} for {model}'}}), 404
+
+    @server.route('/v1/meetings', methods=['POST'])
+    def meetings():
+        track('meetings')
+        try:
+            options.whereby_latency.sleep()
+            error = injected_error()
+            if error:
+                return error
+            body = request.get_json(silent=True) or {}
+            room = uuid.uuid4().hex[:12]
+            return jsonify({
+                'meetingId': room,
+                'roomUrl': f'https://fake.whereby.local/{room}',
+                'hostRoomUrl': f'https://fake.whereby.local/{room}?host=1',
+                'startDate': datetime.utcnow().isoformat() + 'Z',
+                'endDate': body.get('endDate', (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'),
+            }), 201
+        finally:
+            done()
+
+    @server.route('/stats')
+    def get_stats():
+        with lock:
+            return jsonify(dict(stats))
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--gemini-latency', type=Latency, default=Latency('lognormal:800:0.4'),
+                        help='generateContent latency / stream time to first token (default lognormal:800:0.4)')
+    parser.add_argument('--whereby-latency', type=Latency, default=Latency('uniform:150:400'),
+                        help='/v1/meetings latency (default uniform:150:400)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests that fail (0-1)')
+    parser.add_argument('--error-code', type=int, default=503, help='HTTP status for injected failures')
+    parser.add_argument('--stream-chunks', type=int, default=8, help='Chunks per streamed reply')
+    parser.add_argument('--chunk-delay-ms', type=float, default=60, help='Delay between streamed chunks')
+    parser.add_argument('--reply-words', type=int, default=60, help='Words per generated reply')
+    parser.add_argument('--skills', default='Python,SQL,Machine Learning,Docker,React,Java',
+                        help='Comma-separated skills returned for certificate prompts')
+    parser.add_argument('--seed', type=int, default=None)
+    options = parser.parse_args()
+    options.skills = [s.strip() for s in options.skills.split(',') if s.strip()]
+    random.seed(options.seed)
+
+    print(f"Fake AI server on http://{options.host}:{options.port} "
+          f"(gemini {options.gemini_latency.spec}, whereby {options.whereby_latency.spec}, "
+          f"error rate {options.error_rate:.0%})")
+    create_server(options).run(host=options.host, port=options.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@ from bs4 import BeautifulSoup
 import json
 import random
 from datetime import datetime
-from app import app, db, Student, Company, JobPosting, INDIAN_IT_CITIES, BPUT_COLLEGES
+from app import app, db, Student, Company, JobPosting, INDIAN_IT_CITIES, BPUT_COLLEGES, sync_job_skills
 from werkzeug.security import generate_password_hash
 
 
@@ -143,6 +143,8 @@ def create_dummy_data():
                 contact_mobile=f"99887{10000 + index}"
             )
             db.session.add(job)
+            db.session.flush()
+            sync_job_skills(job.id, skills_list)
 
         print("Committing all jobs...")
         try: